@@ -1,2 +1,3 @@
-from .base import View, TemplateView
+from .base import View, TemplateView, StreamingTemplateView, JSONView,\
+    NegotiatedView
 from .exceptions import ActionResponse
@@ -1,140 +1,725 @@
-from functools import partial, update_wrapper
+from collections import namedtuple, OrderedDict
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, update_wrapper
+from time import perf_counter
+from types import MappingProxyType, MethodType
+import asyncio
 import inspect
 import logging
+import os
+import re
 
-from django.conf.urls import url, include
+from django.conf.urls import url
+from django.core.exceptions import ImproperlyConfigured
 from django.core.urlresolvers import resolve
-from django.http.response import HttpResponseNotAllowed, HttpResponse,\
-    HttpResponseBase
+from django.db import close_old_connections
+from django.http.response import HttpResponseBadRequest,\
+    HttpResponseNotAllowed, HttpResponse,\
+    HttpResponseBase, StreamingHttpResponse
+from django.template import TemplateDoesNotExist
+from django.template.loader import select_template
 from django.template.response import TemplateResponse
+from django.utils.cache import patch_vary_headers
 from django.utils.decorators import classonlymethod
 
+from . import limits, timing
+from .batch import get_batch_items, run_batch_item
+from .cache import get_view_path
+from .converters import get_converter
 from .exceptions import ActionResponse
+from .http import is_not_modified, not_modified, set_validators
+from .renderers import JSONRenderer, MessagePackRenderer, Renderer,\
+    build_negotiation_table, json_dumps, negotiate, stream_json_array
+from .resolvers import ActionURLPattern, ActionURLResolver,\
+    ConvertingURLResolver
 
 
 logger = logging.getLogger('django.actionviews')
 
 
+ActionPlan = namedtuple('ActionPlan', [
+    'name',  # action name as used in url names and templates
+    'action',  # action method
+    'prefix',  # url prefix from `self` annotation or action name, or None
+    'params',  # action parameters except `self` as `inspect.Parameter`s
+    'param_names',  # names of the action parameters
+    'defaults',  # default values of the action parameters
+    'converters',  # `(name, converter)` pairs of the typed action parameters
+    'allowed_methods',  # lowercase names of the methods the action allows
+    'handlers',  # request method to view class handler mapping
+    'allow',  # `Allow` header value listing the allowed methods
+    'is_async',  # whether the action or any of its handlers is a coroutine
+    'condition',  # `(etag_func, last_modified_func)` of the action or None
+    'head_handler',  # cheap HEAD requests handler of the action or None
+    'loaders',  # `(name, loader)` pairs of the action context loaders
+    'limiter',  # `ActionLimiter` capping the action executions or None
+    'render_cache',  # `RenderCache` of the action rendered content or None
+    'negotiation',  # `NegotiationTable` of the action renderers or None
+])
+
+
+def build_action_plan(view_class, action_name, action_method):
+    """Precompute everything needed to route and dispatch `action_method` of
+    `view_class` so that the request path doesn't have to.
+    """
+    prefix = None
+    params = []
+    defaults = {}
+    converters = []
+
+    for parameter in inspect.signature(action_method).parameters.values():
+
+        if parameter.name == 'self':
+            prefix = (parameter.annotation is inspect._empty
+                and action_name
+                or parameter.annotation)
+            continue
+
+        params.append(parameter)
+
+        if parameter.default is not inspect._empty:
+            defaults[parameter.name] = parameter.default
+
+        if parameter.annotation is inspect._empty:
+            continue
+
+        converter = get_converter(parameter.annotation)
+
+        if converter is not None:
+            converters.append((parameter.name, converter))
+        elif not isinstance(parameter.annotation, str):
+            raise ImproperlyConfigured(
+                'Parameter `{}` of action `{}` must be annotated with regex '
+                'string, registered type or converter'.format(
+                    parameter.name, action_name))
+
+    allowed_methods = tuple(
+        method_name for method_name in map(str.lower, getattr(
+            action_method, 'allowed_methods', view_class.http_method_names))
+        if hasattr(view_class, method_name))
+
+    handlers = {method_name.upper(): getattr(view_class, method_name)
+        for method_name in allowed_methods}
+
+    is_async = any(map(asyncio.iscoroutinefunction,
+        [action_method] + list(handlers.values())))
+
+    condition = (
+        getattr(action_method, 'etag_func', None),
+        getattr(action_method, 'last_modified_func', None))
+
+    renderers = getattr(
+        action_method, 'renderers', getattr(view_class, 'renderers', None))
+
+    limiter = getattr(action_method, 'limiter', None)
+
+    if limiter is not None:
+        limits.register('{}.{}'.format(
+            get_view_path(view_class), action_name), limiter)
+
+    return ActionPlan(
+        name=action_name,
+        action=action_method,
+        prefix=prefix,
+        params=tuple(params),
+        param_names=tuple(parameter.name for parameter in params),
+        defaults=MappingProxyType(defaults),
+        converters=tuple(converters),
+        allowed_methods=allowed_methods,
+        handlers=MappingProxyType(handlers),
+        allow=', '.join(handlers),
+        is_async=is_async,
+        condition=condition if any(condition) else None,
+        head_handler=getattr(action_method, 'head_handler', None),
+        loaders=tuple(getattr(action_method, 'loaders', {}).items()),
+        limiter=limiter,
+        render_cache=getattr(action_method, 'render_cache', None),
+        negotiation=renderers and build_negotiation_table(renderers))
+
+
+ParentLink = namedtuple('ParentLink', [
+    'key',  # url kwargs key the link is passed to the child view with
+    'name',  # parent action name
+    'action',  # parent action made by `as_parent_action`
+    'param_names',  # names of the parent action parameters
+    'view_class',  # view class the parent action belongs to
+    'child_view',  # view class included under the parent action
+])
+
+
+def order_parent_links(links):
+    """Sort parent links found in the url kwargs from the outermost ancestor
+    to the closest one.
+    """
+    if len(links) < 2:
+        return links
+
+    child_views = {link.child_view for link in links}
+    links_by_view = {link.view_class: link for link in links}
+    link = next(link for link in links if link.view_class not in child_views)
+    chain = []
+
+    while link is not None:
+        chain.append(link)
+        link = links_by_view.get(link.child_view)
+
+    return chain
+
+
+def get_url_params(kwargs):
+    """Url kwargs without the parent links, i.e. parameters of the action and
+    its parent actions.
+    """
+    return {name: value for name, value in kwargs.items()
+        if not isinstance(value, ParentLink)}
+
+
+def get_parent_aliases(links):
+    """Keys of the ordered parent links results in `parents`. The action
+    name is used unless other ancestor action has the same name, then it is
+    qualified with the view class name, e.g. `OrgView.detail`.
+    """
+    names = [link.name for link in links]
+
+    return [link.name if names.count(link.name) == 1 else
+            '{}.{}'.format(link.view_class.__name__, link.name)
+        for link in links]
+
+
+def get_parent_memo_key(link, params):
+    """Key to memoize parent action result with for the request or None if
+    parameter values are unhashable.
+    """
+    memo_key = (link.key,) + tuple(
+        params[param_name] for param_name in link.param_names)
+
+    try:
+        hash(memo_key)
+    except TypeError:
+        return None
+
+    return memo_key
+
+
+def get_request_parents(request):
+    """Ordered mapping of the parent action aliases, see
+    `get_parent_aliases`, to their results evaluated for the request.
+    """
+    try:
+        return request.action_parents
+    except AttributeError:
+        parents = request.action_parents = OrderedDict()
+        return parents
+
+
+def method_not_allowed(request, plan):
+    """Build 405 response for the action plan.
+    """
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning(
+            'Method Not Allowed (%s): %s',
+            request.method,
+            request.path,
+            extra={
+                'status_code': 405,
+                'request': request
+            }
+        )
+
+    response = HttpResponseNotAllowed(())
+    response['Allow'] = plan.allow
+    return response
+
+
+def options_response(plan):
+    """Build OPTIONS response for the action plan.
+    """
+    response = HttpResponse()
+    response['Allow'] = plan.allow
+    response['Content-Length'] = '0'
+    return response
+
+
+@lru_cache(maxsize=1)
+def get_default_loader_executor():
+    return ThreadPoolExecutor()
+
+
+def run_loader(loader, view, kwargs):
+    """Run sync context loader on an executor thread. Database connections
+    the loader opened are closed like at the end of a request as the pool
+    threads aren't served by the request/response cycle.
+    """
+    try:
+        return loader(view, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def discard_loaders(futures):
+    """Cancel context loaders of the failed action which haven't started yet
+    and retrieve the exceptions of the finished ones.
+    """
+    for name, future in futures:
+
+        if not future.cancel() and future.done() and not future.cancelled():
+            future.exception()
+
+
+def then(result, callback):
+    """Call `callback` with `result` or, if `result` is awaitable, return
+    a coroutine calling `callback` with the awaited result.
+    """
+    if inspect.isawaitable(result):
+
+        async def await_result():
+            return callback(await result)
+
+        return await_result()
+
+    return callback(result)
+
+
 class ContextMixin(object):
 
-    """A default context mixin that handles current action and its parent and
-    passes the result as the template context.
+    """A default context mixin that handles current action and its parents
+    and passes the result as the template context.
+
+    Parent actions of nested child views are evaluated from the outermost
+    one, once per request, and their results are available as `parents`
+    both on the view and in the context.
+
+    Context loaders of the action run concurrently with the action, on the
+    `loader_executor` thread pool or as tasks if they are coroutines, and
+    their results are put to the context by loader names. Database
+    connections opened by the pool threads are closed after every loader.
+    Loaders of an action which fails or returns a response are cancelled
+    unless they run already and their results aren't waited for.
     """
+    __slots__ = ()
+
+    loader_executor = None
 
     def get_context_data(self, **kwargs):
+
+        if self.plan.is_async:
+            return self.get_context_data_async(**kwargs)
+
+        self.context = {}
+        memo = self.request.__dict__.setdefault('action_parent_results', {})
+
+        for link, params, alias in self.pop_parent_links(kwargs):
+            memo_key = get_parent_memo_key(link, params)
+
+            if memo_key in memo:
+                result = memo[memo_key]
+            else:
+                started = timing.collectors and perf_counter()
+                result = link.action(self.request, **params)
+
+                if started:
+                    timing.emit(link.view_class, link.name, 'parent', started)
+
+                if memo_key is not None:
+                    memo[memo_key] = result
+
+            self.parents[alias] = result
+
+        self.update_parents_context()
+
+        futures = self.plan.loaders and self.submit_loaders(kwargs)
+
+        try:
+            started = timing.collectors and perf_counter()
+            action_result = self.action(**kwargs)
+
+            if started:
+                timing.emit(self.__class__, self.plan.name, 'action', started)
+
+            # short-circuiting action doesn't wait for the loaders
+            if isinstance(action_result, HttpResponseBase):
+                raise ActionResponse(action_result)
+
+            for name, future in futures:
+                self.context[name] = future.result()
+        except BaseException:
+            discard_loaders(futures)
+            raise
+
+        self.update_context(action_result)
+
+        return self.context
+
+    async def get_context_data_async(self, **kwargs):
+        """The same as `get_context_data` but awaits parent actions and the
+        action itself if they are coroutines.
+        """
         self.context = {}
+        memo = self.request.__dict__.setdefault('action_parent_results', {})
+
+        for link, params, alias in self.pop_parent_links(kwargs):
+            memo_key = get_parent_memo_key(link, params)
+
+            if memo_key in memo:
+                result = memo[memo_key]
+            else:
+                started = timing.collectors and perf_counter()
+                result = link.action(self.request, **params)
+
+                if inspect.isawaitable(result):
+                    result = await result
+
+                if started:
+                    timing.emit(link.view_class, link.name, 'parent', started)
+
+                if memo_key is not None:
+                    memo[memo_key] = result
+
+            self.parents[alias] = result
+
+        self.update_parents_context()
+
+        futures = self.plan.loaders and self.start_loaders(kwargs)
+
+        try:
+            started = timing.collectors and perf_counter()
+            action_result = self.action(**kwargs)
 
-        if 'parent_action' in kwargs:
-            parent_kwargs = {param_name: kwargs.pop(param_name) for
-                param_name in kwargs.pop('parent_params')}
-            self.context.update(
-                kwargs.pop('parent_action')(self.request, **parent_kwargs))
+            if inspect.isawaitable(action_result):
+                action_result = await action_result
 
-        action_result = self.action(**kwargs)
+            if started:
+                timing.emit(self.__class__, self.plan.name, 'action', started)
+
+            # short-circuiting action doesn't wait for the loaders
+            if isinstance(action_result, HttpResponseBase):
+                raise ActionResponse(action_result)
+
+            for name, future in futures:
+                self.context[name] = await future
+        except BaseException:
+            discard_loaders(futures)
+            raise
+
+        self.update_context(action_result)
+
+        return self.context
+
+    def submit_loaders(self, kwargs):
+        executor = self.get_loader_executor()
+
+        return [(name, executor.submit(run_loader, loader, self, kwargs))
+            for name, loader in self.plan.loaders]
+
+    def start_loaders(self, kwargs):
+        loop = asyncio.get_event_loop()
+
+        return [(name, asyncio.ensure_future(loader(self, **kwargs))
+                if asyncio.iscoroutinefunction(loader) else
+                loop.run_in_executor(
+                    self.get_loader_executor(),
+                    partial(run_loader, loader, self, kwargs)))
+            for name, loader in self.plan.loaders]
+
+    def get_loader_executor(self):
+        """
+        Returns `loader_executor` or the default thread pool shared by the
+        views.
+        """
+        return self.loader_executor or get_default_loader_executor()
+
+    def pop_parent_links(self, kwargs):
+        """Pop parent links and their parameters out of the url kwargs and
+        return them ordered from the outermost ancestor along with the keys
+        of their results in `parents` shared by the request views.
+        """
+        links = [kwargs.pop(key) for key, value in list(kwargs.items())
+            if isinstance(value, ParentLink)]
+        self.parents = get_request_parents(self.request)
+
+        if not links:
+            return []
+
+        links = order_parent_links(links)
+        chain = [(link, {param_name: kwargs[param_name]
+                for param_name in link.param_names}, alias)
+            for link, alias in zip(links, get_parent_aliases(links))]
+
+        # parameters of different ancestors could share the name
+        for link, params, alias in chain:
+
+            for param_name in params:
+                kwargs.pop(param_name, None)
+
+        return chain
+
+    def get_batch_result(self, response):
+        """Return status of the `response` the view dispatched a batch request
+        with and the context without `parents` or the action rows.
+        """
+        if response.status_code != 200:
+            return response.status_code, None
+
+        if getattr(self, 'rows', None) is not None:
+            return 200, list(self.rows)
+
+        context = getattr(self, 'context', None)
+
+        if context is None:
+            return 200, None
+
+        return 200, {key: value for key, value in context.items()
+            if key != 'parents'}
+
+    def update_parents_context(self):
+
+        for result in self.parents.values():
+
+            if result is not None:
+                self.update_context(result)
+
+        if self.parents:
+            self.context['parents'] = self.parents
+
+    def update_context(self, action_result):
 
         if isinstance(action_result, HttpResponseBase):
             raise ActionResponse(action_result)
 
         self.context.update(action_result)
 
-        return self.context
+
+class cached_view_attribute(object):
+
+    """Metaclass data descriptor computing view class attribute on the first
+    access. The result is cached for the very class it was computed for so
+    subclasses compute their own value.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        self.cache_name = '_cached_{}'.format(func.__name__)
+
+    def __get__(self, view_class, meta=None):
+
+        if view_class is None:
+            return self
+
+        try:
+            return view_class.__dict__[self.cache_name]
+        except KeyError:
+            value = self.func(view_class)
+            self.__set__(view_class, value)
+            return value
+
+    def __set__(self, view_class, value):
+        type.__setattr__(view_class, self.cache_name, value)
+
+    def is_cached(self, view_class):
+        return self.cache_name in view_class.__dict__
 
 
 class ActionViewMeta(type):
 
-    def __new__(cls, name, bases, attrs):
-        # construct class to access parent attributes
-        type_new = type.__new__(cls, name, bases, attrs)
+    """View classes metaclass. Actions, their dispatch plans and urls are
+    computed lazily on the first access and cached per class.
+
+    Classes with `compact_instances` enabled get `__slots__` made of their
+    `instance_slots` so the per-request view instances have no `__dict__`.
+    """
 
-        # get action_method_prefix
-        action_method_prefix = type_new.action_method_prefix
+    def __new__(meta, name, bases, namespace):
+        compact_instances = namespace.get('compact_instances', any(
+            getattr(base, 'compact_instances', False) for base in bases))
+
+        if compact_instances and '__slots__' not in namespace:
+            slotted = {slot_name for base in bases for klass in base.__mro__
+                for slot_name in klass.__dict__.get('__slots__', ())}
+            instance_slots = namespace.get('instance_slots', next(
+                (base.instance_slots for base in bases
+                    if hasattr(base, 'instance_slots')), ()))
+            namespace['__slots__'] = tuple(
+                slot_name for slot_name in instance_slots
+                if slot_name not in slotted)
+
+        return super(ActionViewMeta, meta).__new__(
+            meta, name, bases, namespace)
+
+    @cached_view_attribute
+    def actions(cls):
+        """Action name to action method mapping. Actions are found by
+        `action_method_prefix` or taken from `actions` map of action names to
+        method names defined on the class.
+        """
+        action_method_prefix = cls.action_method_prefix
 
-        # find action names and corresponding methods or use defined map
-        if 'actions' in attrs:
-            actions = {name: getattr(type_new, attr_name)
-                for name, attr_name in attrs['actions'].items()}
-        else:
-            actions = {}
-
-            for attr_name in dir(type_new):
-
-                if attr_name.startswith(action_method_prefix):
-                    action_name = attr_name[len(action_method_prefix):]
-
-                    # avoid empty action_name
-                    if action_name:
-                        actions[action_name] = getattr(type_new, attr_name)
-
-        type_new.actions = actions
-
-        # construct urls if there is no custom urls defined
-        if 'urls' not in attrs:
-            urls = []
-
-            for action_name, action_method in type_new.actions.items():
-                param_names = []
-                regex_chunks = []
-                default_values = {}
-                parameters = inspect.signature(
-                    action_method).parameters.values()
-
-                for parameter in parameters:
-
-                    if parameter.name == 'self':
-                        group_name = (parameter.annotation is inspect._empty
-                            and action_name
-                            or parameter.annotation)
-                        sep = group_name and '/'
-                        regex_chunks.append(r'{}{}'.format(group_name, sep))
-                        continue
-
-                    group_name = parameter.name
-                    param_names.append(group_name)
-
-                    if parameter.annotation is inspect._empty:
-                        group_regex = type_new.default_group_regex
-                    else:
-                        group_regex = parameter.annotation
-
-                    if parameter.default is inspect._empty:
-                        group_format = type_new.group_format
-                    else:
-                        default_values[parameter.name] = parameter.default
-                        group_format = r'({})?'.format(type_new.group_format)
-
-                    regex_chunks.append(group_format.format(
-                        group_name=group_name, group_regex=group_regex))
-
-                url_regex = r'^{}'.format(''.join(regex_chunks))
-                action_method.name = action_name
-
-                if hasattr(action_method, 'child_view'):
-                    view = include(action_method.child_view.urls)
-                    default_values.update({
-                        'parent_action': type_new.as_parent_action(
-                            action_method),
-                        'parent_params': param_names,
-                    })
+        # use defined map
+        if 'actions' in cls.__dict__:
+            return {name: getattr(cls, attr_name)
+                for name, attr_name in cls.__dict__['actions'].items()}
+
+        # find action names and corresponding methods
+        actions = {}
+
+        for attr_name in dir(cls):
+
+            if attr_name.startswith(action_method_prefix):
+                action_name = attr_name[len(action_method_prefix):]
+
+                # avoid empty action_name
+                if action_name:
+                    actions[action_name] = getattr(cls, attr_name)
+
+        return actions
+
+    @cached_view_attribute
+    def action_plans(cls):
+        """Action name to precomputed dispatch plan mapping.
+        """
+        action_plans = {}
+
+        for action_name, action_method in cls.actions.items():
+            action_method.name = action_name
+            action_plans[action_name] = build_action_plan(
+                cls, action_name, action_method)
+
+        return action_plans
+
+    @cached_view_attribute
+    def urls(cls):
+        """Url patterns for all the actions unless custom urls are defined on
+        the class. With `batch_url` set the batch view is added. With
+        `single_pass_urls` enabled the patterns are wrapped into a single
+        `ActionURLResolver`.
+        """
+        if 'urls' in cls.__dict__:
+            return cls.__dict__['urls']
+
+        urls = []
+
+        for plan in cls.action_plans.values():
+            url_regex = cls.get_url_regex(plan)
+            default_values = dict(plan.defaults)
+            action_method = plan.action
+
+            if hasattr(action_method, 'child_view'):
+                child_view = action_method.child_view
+
+                if (asyncio.iscoroutinefunction(action_method) and
+                        not all(child_plan.is_async for child_plan in
+                            child_view.action_plans.values())):
+                    raise ImproperlyConfigured(
+                        'Child view `{}` of async action `{}` must have '
+                        'async actions only'.format(
+                            child_view.__name__, plan.name))
+
+                link = ParentLink(
+                    key='parent:{}.{}.{}'.format(
+                        cls.__module__, cls.__qualname__, plan.name),
+                    name=plan.name,
+                    action=cls.as_parent_action(action_method),
+                    param_names=plan.param_names,
+                    view_class=cls,
+                    child_view=child_view)
+                default_values[link.key] = link
+                child_urls = child_view.urls
+
+                # avoid extra resolving level for single pass child views
+                if (len(child_urls) == 1 and
+                        isinstance(child_urls[0], ActionURLResolver)):
+                    urls.append(ActionURLResolver(
+                        url_regex,
+                        child_urls[0].url_patterns,
+                        default_values,
+                        child_view,
+                        converters=plan.converters))
                 else:
-                    url_regex += r'$'
-                    view = type_new.as_view(action_method)
+                    urls.append(ConvertingURLResolver(
+                        url_regex,
+                        child_urls,
+                        default_values,
+                        converters=plan.converters))
+            else:
+                urls.append(ActionURLPattern(
+                    url_regex + r'$',
+                    cls.as_view(action_method),
+                    default_values,
+                    plan.name,
+                    converters=plan.converters))
+
+        if cls.batch_url is not None:
+            urls.append(url(
+                regex=r'^{}$'.format(cls.batch_url),
+                view=cls.as_batch_view(list(urls)),
+                name='batch'))
+
+        if cls.single_pass_urls:
+            return [ActionURLResolver(r'^', urls, view_class=cls)]
+
+        return urls
+
+    def get_url_regex(cls, plan):
+        """Build url regex for the action plan. The regex isn't terminated
+        with `$` so it could be used for child view includes.
+        """
+        regex_chunks = []
+        converters = dict(plan.converters)
+
+        if plan.prefix is not None:
+            sep = plan.prefix and '/'
+            regex_chunks.append(r'{}{}'.format(plan.prefix, sep))
+
+        for parameter in plan.params:
+
+            if parameter.annotation is inspect._empty:
+                group_regex = cls.default_group_regex
+            elif parameter.name in converters:
+                group_regex = converters[parameter.name].regex
+            else:
+                group_regex = parameter.annotation
 
-                urls.append(url(
-                    regex=url_regex,
-                    view=view,
-                    kwargs=default_values,
-                    name=action_name))
+            if parameter.default is inspect._empty:
+                group_format = cls.group_format
+            else:
+                group_format = r'({})?'.format(cls.group_format)
 
-            type_new.urls = urls
+            regex_chunks.append(group_format.format(
+                group_name=parameter.name, group_regex=group_regex))
 
-        return type_new
+        return r'^{}'.format(''.join(regex_chunks))
+
+    def warm_up(cls):
+        """Compute urls of the view class and all its subclasses eagerly,
+        e.g. in a prefork server master process before workers are forked.
+        """
+        view_classes = [cls]
+
+        while view_classes:
+            view_class = view_classes.pop()
+            view_class.urls
+            view_classes.extend(view_class.__subclasses__())
 
 
 class BaseView(metaclass=ActionViewMeta):
 
+    __slots__ = ()
+
     action_method_prefix = 'do_'
     group_format = r'{group_name}/(?P<{group_name}>{group_regex})/'
     default_group_regex = r'[\w\d]+'
+    single_pass_urls = False
+
+    # opt-in batch view url regex, e.g. r'batch/', and max actions per batch
+    batch_url = None
+    batch_max_size = 20
+
+    # opt-in slots for the per-request state, every class of the hierarchy
+    # has to define `__slots__` or enable `compact_instances` to benefit
+    compact_instances = False
+    instance_slots = ('request', 'args', 'kwargs', 'plan', 'action',
+        'context', 'parents', 'rows', 'form')
 
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head',
         'options', 'trace']
@@ -152,21 +737,61 @@ class BaseView(metaclass=ActionViewMeta):
             self.request = request
             self.args = args
             self.kwargs = kwargs
+            self.parents = get_request_parents(request)
 
             # return parent data
             return action_method(self, **kwargs)
 
         # make action look like actual action_method
         update_wrapper(action, action_method)
+        action.view_class = cls
 
         return action
 
+    @classonlymethod
+    def get_action_plan(cls, action):  # @NoSelf
+        """Return precomputed dispatch plan for the action method building one
+        for the methods which aren't registered as the class actions.
+        """
+        action_plans = cls.action_plans
+        plan = action_plans.get(getattr(action, 'name', None))
+
+        if plan is None or plan.action is not action:
+            plan = build_action_plan(
+                cls, getattr(action, 'name', action.__name__), action)
+
+        return plan
+
     @classonlymethod
     def as_view(cls, action):  # @NoSelf
         """Action method to view factory.
         """
+        plan = cls.get_action_plan(action)
+
+        # answer OPTIONS and disallowed methods without view instance unless
+        # the class customizes these responses
+        if (cls.dispatch is BaseView.dispatch and
+                cls.http_method_not_allowed is
+                    BaseView.http_method_not_allowed):
+            fast_handlers = plan.handlers
+        else:
+            fast_handlers = {}
 
-        def view(request, *args, **kwargs):
+        # limit executions in flight before the view is instantiated
+        limiter = plan.limiter
+
+        def fast_path(request):
+            handler = fast_handlers.get(request.method)
+
+            if handler is None:
+                return method_not_allowed(request, plan)
+
+            if handler is BaseView.options:
+                return options_response(plan)
+
+            return None
+
+        def setup(request, args, kwargs):
             # get view class instance
             self = cls()
 
@@ -174,16 +799,153 @@ class BaseView(metaclass=ActionViewMeta):
             self.request = request
             self.args = args
             self.kwargs = kwargs
+            self.plan = plan
+
+            # bound method proxies action attributes like `name`
+            self.action = MethodType(action, self)
+
+            return self
+
+        if plan.is_async:
+
+            async def view(request, *args, **kwargs):
+
+                if fast_handlers:
+                    response = fast_path(request)
+
+                    if response is not None:
+                        return response
 
-            # make self.action look like actual action method
-            self.action = partial(action, self)
-            update_wrapper(self.action, action)
+                # async views never wait for a free slot blocking the loop
+                if limiter is not None and not limiter.acquire(False):
+                    return limiter.reject()
 
-            # dispatch request
-            return self.dispatch(request, *args, **kwargs)
+                try:
+                    self = setup(request, args, kwargs)
+
+                    # dispatch request awaiting async handlers
+                    started = timing.collectors and perf_counter()
+                    response = self.dispatch(request, *args, **kwargs)
+
+                    if inspect.isawaitable(response):
+
+                        try:
+                            response = await response
+                        except ActionResponse as e:
+
+                            if started:
+                                timing.emit(
+                                    cls, plan.name, 'short_circuit', started)
+
+                            response = e.response
+                except BaseException:
+
+                    if limiter is not None:
+                        limiter.release()
+
+                    raise
+
+                if limiter is not None:
+                    limits.release_after(limiter, response)
+
+                return response
+
+        else:
+
+            def view(request, *args, **kwargs):
+
+                if fast_handlers:
+                    response = fast_path(request)
+
+                    if response is not None:
+                        return response
+
+                if limiter is not None and not limiter.acquire():
+                    return limiter.reject()
+
+                try:
+                    self = setup(request, args, kwargs)
+
+                    # dispatch request
+                    response = self.dispatch(request, *args, **kwargs)
+                except BaseException:
+
+                    if limiter is not None:
+                        limiter.release()
+
+                    raise
+
+                # the response may be rendered or streamed after the view
+                # returns
+                if limiter is not None:
+                    limits.release_after(limiter, response)
+
+                return response
 
         # make view look like action
         update_wrapper(view, action)
+        view.view_class = cls
+        view.plan = plan
+
+        if not plan.is_async:
+
+            def batch(request, *args, **kwargs):
+
+                if limiter is not None and not limiter.acquire():
+                    return limiter.reject().status_code, None
+
+                try:
+                    self = setup(request, args, kwargs)
+
+                    # dispatch the same way as the view does so the access
+                    # checks of the view apply
+                    response = self.dispatch(request, *args, **kwargs)
+
+                    return self.get_batch_result(response)
+                finally:
+
+                    if limiter is not None:
+                        limiter.release()
+
+            view.batch = batch
+
+        return view
+
+    @classonlymethod
+    def as_batch_view(cls, urls):  # @NoSelf
+        """Batch view factory. The view runs the actions resolved by `urls`
+        for the paths given with `path` query parameters or in the JSON body
+        of POST request and returns their results as JSON list. Parent
+        actions shared by the paths are evaluated once.
+        """
+        resolver = ActionURLResolver(r'^', urls, view_class=cls)
+        batch_path_re = re.compile(r'{}$'.format(cls.batch_url))
+
+        def view(request, *args, **kwargs):
+
+            try:
+                items = get_batch_items(request)
+            except ValueError:
+                return HttpResponseBadRequest()
+
+            if len(items) > cls.batch_max_size:
+                return HttpResponseBadRequest()
+
+            # share parent actions results between the actions
+            request.__dict__.setdefault('action_parent_results', {})
+
+            match = batch_path_re.search(request.path)
+            base_path = request.path[:match.start()] if match else '/'
+
+            # items are encoded one by one
+            return HttpResponse(stream_json_array(
+                (run_batch_item(
+                    resolver, request, base_path, path, params, json_dumps)
+                    for path, params in items),
+                dumps=lambda encoded: encoded),
+                content_type='application/json')
+
+        view.view_class = cls
 
         return view
 
@@ -191,54 +953,133 @@ class BaseView(metaclass=ActionViewMeta):
         """Try to dispatch to the right action; defer to the error handler if
         the request method isn't on the approved list.
         """
-        http_method_names = getattr(
-            self.action, 'allowed_methods', self.http_method_names)
+        handler = self.plan.handlers.get(request.method)
 
-        if request.method.lower() in http_method_names:
-            handler = getattr(
-                self,
-                request.method.lower(),
-                self.http_method_not_allowed)
-        else:
-            handler = self.http_method_not_allowed
+        if handler is None:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+
+        if (self.plan.condition is not None and
+                request.method in ('GET', 'HEAD')):
+            etag, last_modified = self.get_validators(**kwargs)
+
+            if is_not_modified(request, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+            return then(
+                self.dispatch_handler(handler, request, *args, **kwargs),
+                partial(set_validators,
+                    etag=etag, last_modified=last_modified))
+
+        return self.dispatch_handler(handler, request, *args, **kwargs)
+
+    def dispatch_handler(self, handler, request, *args, **kwargs):
+        started = timing.collectors and perf_counter()
 
         try:
-            return handler(request, *args, **kwargs)
+            return handler(self, request, *args, **kwargs)
         except ActionResponse as e:
+
+            if started:
+                timing.emit(
+                    self.__class__, self.plan.name, 'short_circuit', started)
+
             return e.response
 
+    def get_validators(self, **kwargs):
+        """Evaluate the action validators set by `condition` decorator with
+        the url kwargs, including parent actions parameters, before running
+        any action.
+        """
+        params = get_url_params(kwargs)
+
+        return tuple(
+            validator and validator(self, **params)
+            for validator in self.plan.condition)
+
     def http_method_not_allowed(self, request, *args, **kwargs):
-        logger.warning(
-            'Method Not Allowed (%s): %s',
-            request.method,
-            request.path,
-            extra={
-                'status_code': 405,
-                'request': self.request
-            }
-        )
-        return HttpResponseNotAllowed(self._allowed_methods())
+        return method_not_allowed(request, self.plan)
 
     def options(self, request, *args, **kwargs):
         """
         Handles responding to requests for the OPTIONS HTTP verb.
         """
-        response = HttpResponse()
-        response['Allow'] = ', '.join(self._allowed_methods())
-        response['Content-Length'] = '0'
-        return response
+        return options_response(self.plan)
 
     def _allowed_methods(self):
-        return map(str.upper,
-            filter(partial(hasattr, self),
-                getattr(
-                    self.action,
-                    'allowed_methods',
-                    self.http_method_names)))
+        return list(self.plan.handlers)
 
 
 class View(BaseView, ContextMixin):
-    pass
+    __slots__ = ()
+
+
+class HeadResponseMixin(object):
+
+    """
+    A mixin that answers HEAD requests with the headers only. The action runs
+    but the body isn't rendered, or, if the action has a `head_handler`, it
+    is called with the url kwargs instead of the parent actions and the
+    action. The handler returns a headers dict, None or a response.
+    """
+    __slots__ = ()
+
+    def head(self, request, *args, **kwargs):
+        head_handler = self.plan.head_handler
+
+        if head_handler is None:
+            return then(
+                self.get_context_data(**kwargs), self.render_head_response)
+
+        return then(
+            head_handler(self, **get_url_params(kwargs)),
+            self.render_head_headers)
+
+    def render_head_response(self, context, **response_kwargs):
+        """
+        Returns an empty response with the content type of the rendered one.
+        """
+        response_kwargs.setdefault('content_type', self.content_type)
+        return HttpResponse(**response_kwargs)
+
+    def render_head_headers(self, headers):
+
+        if isinstance(headers, HttpResponseBase):
+            return headers
+
+        response = self.render_head_response({})
+
+        for name, value in (headers or {}).items():
+            response[name] = value
+
+        return response
+
+
+class ActionTemplateResponse(TemplateResponse):
+
+    """Template response reporting rendering time to the timing collectors
+    if `timing_tags` of view class and action name are set.
+    """
+
+    timing_tags = None
+
+    @property
+    def rendered_content(self):
+        started = self.timing_tags and perf_counter()
+        content = super(ActionTemplateResponse, self).rendered_content
+
+        if started:
+            timing.emit(*self.timing_tags, phase='render', started=started)
+
+        return content
+
+
+@lru_cache(maxsize=1024)
+def format_template_names(template_name, namespace, view_name, action_name):
+    return (template_name.format_map({
+        'namespace': namespace,
+        'view_name': view_name,
+        'action_name': action_name,
+    }).strip('/'),)
 
 
 class TemplateResponseMixin(object):
@@ -246,8 +1087,10 @@ class TemplateResponseMixin(object):
     """
     A mixin that can be used to render a template.
     """
+    __slots__ = ()
+
     template_name = '{namespace}/{view_name}/{action_name}.html'
-    response_class = TemplateResponse
+    response_class = ActionTemplateResponse
     content_type = None
 
     def render_to_response(self, context, **response_kwargs):
@@ -259,46 +1102,348 @@ class TemplateResponseMixin(object):
         passed to the constructor of the response class.
         """
         response_kwargs.setdefault('content_type', self.content_type)
-        return self.response_class(
+        response = self.response_class(
             request=self.request,
             template=self.get_template_names(),
             context=context,
             **response_kwargs
         )
 
+        if timing.collectors:
+            response.timing_tags = (self.__class__, self.plan.name)
+
+        return response
+
     def get_template_names(self):
         """
         Returns a list of template names parsed from template_name using action
         method name to be used for the request. Must return a list. May not be
         called if render_to_response is overridden.
         """
+        return list(format_template_names(
+            self.template_name,
+            self.get_namespace(),
+            self.__class__.__name__,
+            self.plan.name))
+
+    def get_namespace(self):
+        """
+        Returns the namespace of the url the request was resolved with. Falls
+        back to resolving request path only if the request wasn't routed by
+        the url resolver, e.g. when the view is called directly.
+        """
+        resolver_match = getattr(self.request, 'resolver_match', None)
 
-        return [self.template_name.format_map({
-            'namespace': resolve(self.request.path).namespace,
-            'view_name': self.__class__.__name__,
-            'action_name': self.action.name,
-        }).strip('/')]
+        if resolver_match is None:
+            resolver_match = resolve(self.request.path)
 
+        return resolver_match.namespace
 
-class TemplateView(TemplateResponseMixin, View):
+
+class TemplateView(HeadResponseMixin, TemplateResponseMixin, View):
 
     """
     A view that renders a template.  This view will also pass into the context
     any keyword arguments passed by the url conf.
     """
+    __slots__ = ()
 
     def get(self, request, *args, **kwargs):
-        context = self.get_context_data(**kwargs)
-        return self.render_to_response(context)
 
-    # support basic methods by default
-    post = head = get
+        # batch requests need the context rather than the cached content
+        if (self.plan.render_cache is not None and
+                request.method == 'GET' and
+                not getattr(request, 'action_batch', False)):
+            return self.get_cached_response(**kwargs)
+
+        return then(
+            self.get_context_data(**kwargs), self.render_to_response)
+
+    def get_render_vary_items(self):
+        """
+        Returns `(name, value)` pairs of what the content rendered for the
+        request depends on besides the action and the url namespace.
+        """
+        return []
+
+    def get_cached_response(self, **kwargs):
+        """
+        Returns a response with the content cached by `cache_render` or
+        renders and caches it. Only one request renders a missing entry.
+        """
+        render_cache = self.plan.render_cache
+        key, result = render_cache.get(
+            self, self.plan.name, get_url_params(kwargs))
+
+        if result is not None:
+            return render_cache.make_response(result)
+
+        locked = render_cache.acquire(key)
+
+        if not locked:
+            result = render_cache.wait(key)
+
+            if result is not None:
+                return render_cache.make_response(result)
+
+        try:
+            response = self.render_to_response(
+                self.get_context_data(**kwargs))
+
+            if hasattr(response, 'render'):
+                response.render()
+
+            render_cache.set(key, response)
+        finally:
+
+            if locked:
+                render_cache.release(key)
+
+        return response
+
+    # support basic methods by default, HEAD is handled by HeadResponseMixin
+    post = get
+
+
+class StreamingMixin(object):
+
+    """
+    A mixin keeping an iterator returned by the action, e.g. by a generator
+    action, as `rows` to be streamed instead of merging it into the context.
+    """
+    __slots__ = ()
+
+    rows = None
+
+    def __init__(self, *args, **kwargs):
+        super(StreamingMixin, self).__init__(*args, **kwargs)
+        # a slot of the compact instances hides the class attribute default
+        self.rows = None
+
+    def update_context(self, action_result):
+
+        if isinstance(action_result, Iterator):
+            self.rows = action_result
+        else:
+            super(StreamingMixin, self).update_context(action_result)
+
+
+class StreamingTemplateResponseMixin(StreamingMixin, TemplateResponseMixin):
+
+    """
+    A mixin that streams the action `rows` rendering the action template per
+    item. The optional head and tail templates named with `head_suffix` and
+    `tail_suffix` are rendered before and after the items with the context
+    only. Actions returning dicts are rendered as usual.
+    """
+    __slots__ = ()
+
+    streaming_response_class = StreamingHttpResponse
+    head_suffix = '_head'
+    tail_suffix = '_tail'
+
+    def render_to_response(self, context, **response_kwargs):
+
+        if self.rows is None:
+            return super(
+                StreamingTemplateResponseMixin, self).render_to_response(
+                    context, **response_kwargs)
+
+        response_kwargs.setdefault('content_type', self.content_type)
+        return self.streaming_response_class(
+            self.stream(context, *self.get_stream_templates()),
+            **response_kwargs
+        )
+
+    def get_stream_templates(self):
+        """
+        Returns head, row and tail templates. Head and tail are None unless
+        they exist. Templates are loaded before streaming starts so a missing
+        row template fails the request right away.
+        """
+        template_names = self.get_template_names()
+        row_template = select_template(template_names)
+
+        def get_part_template(suffix):
+            part_names = ['{}{}{}'.format(name, suffix, ext) for name, ext in
+                map(os.path.splitext, template_names)]
+
+            try:
+                return select_template(part_names)
+            except TemplateDoesNotExist:
+                return None
+
+        return (
+            get_part_template(self.head_suffix),
+            row_template,
+            get_part_template(self.tail_suffix))
+
+    def stream(self, context, head_template, row_template, tail_template):
+
+        if head_template is not None:
+            yield head_template.render(context, self.request)
+
+        for row in self.rows:
+            row_context = dict(context)
+
+            if isinstance(row, Mapping):
+                row_context.update(row)
+            else:
+                row_context['row'] = row
+
+            yield row_template.render(row_context, self.request)
+
+        if tail_template is not None:
+            yield tail_template.render(context, self.request)
+
+
+class StreamingTemplateView(StreamingTemplateResponseMixin, TemplateView):
+
+    """
+    A template view streaming output of the generator actions.
+    """
+    __slots__ = ()
+
+
+class JSONResponseMixin(StreamingMixin):
+
+    """
+    A mixin that renders the context as JSON without the template engine.
+    The action `rows` are streamed as JSON array instead. `json_dumps` is
+    the encoder which uses `orjson` if it is installed.
+    """
+    __slots__ = ()
+
+    json_dumps = staticmethod(json_dumps)
+    response_class = HttpResponse
+    streaming_response_class = StreamingHttpResponse
+    content_type = 'application/json'
+
+    def render_to_response(self, context, **response_kwargs):
+        """
+        Returns a response with the JSON encoded data or a streaming response
+        with the JSON array of the action rows.
+        """
+        response_kwargs.setdefault('content_type', self.content_type)
+
+        if self.rows is not None:
+            return self.streaming_response_class(
+                stream_json_array(self.rows, self.json_dumps),
+                **response_kwargs
+            )
+
+        started = timing.collectors and perf_counter()
+        content = self.json_dumps(self.get_json_data(context))
+
+        if started:
+            timing.emit(self.__class__, self.plan.name, 'render', started)
+
+        return self.response_class(content, **response_kwargs)
+
+    def get_json_data(self, context):
+        """
+        Returns the data to be encoded. Parent actions results are merged into
+        the context already so `parents` are left out.
+        """
+        return {key: value for key, value in context.items()
+            if key != 'parents'}
+
+
+class JSONView(HeadResponseMixin, JSONResponseMixin, View):
+
+    """
+    A view that renders the action result as JSON.
+    """
+    __slots__ = ()
+
+    def get(self, request, *args, **kwargs):
+        return then(
+            self.get_context_data(**kwargs), self.render_to_response)
+
+    # support basic methods by default, HEAD is handled by HeadResponseMixin
+    post = get
+
+
+class TemplateRenderer(Renderer):
+
+    """
+    A renderer that delegates to the rendering the view class has next to
+    `ContentNegotiationMixin`, e.g. to the (streaming) template rendering.
+    """
+    media_type = 'text/html'
+    format = 'html'
+
+    def render(self, view, context, **response_kwargs):
+        return super(ContentNegotiationMixin, view).render_to_response(
+            context, **response_kwargs)
+
+    def render_head(self, view, context, **response_kwargs):
+        return super(ContentNegotiationMixin, view).render_head_response(
+            context, **response_kwargs)
+
+
+class ContentNegotiationMixin(StreamingMixin):
+
+    """
+    A mixin that renders the action with one of the `renderers` chosen by
+    the `format_query_param` request parameter or by the `Accept` header.
+    The first renderer is the default one. Renderers are looked up in the
+    negotiation table precomputed for the action which could have its own
+    renderers set by `render_with` decorator.
+    """
+    __slots__ = ()
+
+    renderers = (TemplateRenderer(), JSONRenderer(), MessagePackRenderer())
+    format_query_param = 'format'
+
+    def render_to_response(self, context, **response_kwargs):
+        renderer = self.get_renderer()
+
+        if renderer is None:
+            return HttpResponse(status=406)
+
+        response = renderer.render(self, context, **response_kwargs)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def render_head_response(self, context, **response_kwargs):
+        renderer = self.get_renderer()
+
+        if renderer is None:
+            return HttpResponse(status=406)
+
+        response = renderer.render_head(self, context, **response_kwargs)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def get_render_vary_items(self):
+        renderer = self.get_renderer()
+        return [('renderer', renderer and renderer.media_type)]
+
+    def get_renderer(self):
+        """
+        Returns the renderer acceptable for the request or None.
+        """
+        return negotiate(
+            self.plan.negotiation,
+            self.request.META.get('HTTP_ACCEPT'),
+            self.request.GET.get(self.format_query_param))
+
+
+class NegotiatedView(ContentNegotiationMixin, StreamingTemplateView):
+
+    """
+    A view that renders the action result as HTML, JSON or MessagePack
+    depending on what the client accepts.
+    """
+    __slots__ = ()
 
 
 class DummyView(View):
 
     """ Dummy view for testing purposes
     """
+    __slots__ = ()
 
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(**kwargs)
@@ -0,0 +1,110 @@
+"""Batch requests running many actions of a view in one HTTP request."""
+import copy
+import json
+import logging
+
+from django.core.exceptions import PermissionDenied
+from django.core.urlresolvers import Resolver404
+from django.http import Http404, QueryDict
+
+
+logger = logging.getLogger('django.actionviews')
+
+
+def get_batch_items(request):
+    """Return `(path, params)` pairs from `path` query parameters or from the
+    JSON body of POST request. Body items are paths or objects with `path`
+    and optional query `params`. Raises ValueError for malformed items.
+    """
+    if request.method == 'POST':
+        items = json.loads(request.body.decode(request.encoding or 'utf-8'))
+    else:
+        items = request.GET.getlist('path')
+
+    if not isinstance(items, list):
+        raise ValueError('Batch items must be a list')
+
+    batch_items = []
+
+    for item in items:
+
+        if isinstance(item, str):
+            item = {'path': item}
+
+        try:
+            path = item['path']
+            params = item.get('params') or {}
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError('Malformed batch item: {!r}'.format(item))
+
+        if not isinstance(path, str) or not isinstance(params, dict):
+            raise ValueError('Malformed batch item: {!r}'.format(item))
+
+        batch_items.append((path.lstrip('/'), params))
+
+    return batch_items
+
+
+def make_sub_request(request, path, params, resolver_match):
+    """Copy of the batch `request` for GET request of `path` with `params`.
+    Parent actions results memoized for the batch request are shared while
+    every sub request gets its own `parents`. The sub request is marked with
+    `action_batch` attribute.
+    """
+    query = QueryDict(mutable=True)
+
+    for name, value in params.items():
+        query.setlist(name, value if isinstance(value, list) else [value])
+
+    sub_request = copy.copy(request)
+    sub_request.__dict__.pop('action_parents', None)
+    sub_request.action_batch = True
+    sub_request.method = 'GET'
+    sub_request.path = sub_request.path_info = path
+    sub_request.GET = query
+    sub_request.META = dict(
+        request.META,
+        REQUEST_METHOD='GET',
+        PATH_INFO=path,
+        QUERY_STRING=query.urlencode())
+    sub_request.resolver_match = resolver_match
+
+    return sub_request
+
+
+def run_batch_item(resolver, request, base_path, path, params, dumps):
+    """Resolve `path` against the view urls and run the action. Returns the
+    result with the `path`, response `status` and the action `data` encoded
+    with `dumps` on its own so the data which can't be encoded fails the
+    item only with 500 status.
+    """
+    result = {'path': path, 'status': 404, 'data': None}
+
+    try:
+        resolver_match = resolver.resolve(path)
+    except Resolver404:
+        return dumps(result)
+
+    batch = getattr(resolver_match.func, 'batch', None)
+
+    # only sync actions could be run in a batch
+    if batch is None:
+        return dumps(result)
+
+    sub_request = make_sub_request(
+        request, base_path + path, params, resolver_match)
+
+    try:
+        result['status'], result['data'] = batch(
+            sub_request, *resolver_match.args, **resolver_match.kwargs)
+    except Http404:
+        pass
+    except PermissionDenied:
+        result['status'] = 403
+
+    try:
+        return dumps(result)
+    except (TypeError, ValueError):
+        logger.error(
+            'Batch item data is not serializable: %s', path, exc_info=True)
+        return dumps({'path': path, 'status': 500, 'data': None})
@@ -0,0 +1,188 @@
+from hashlib import md5
+from time import perf_counter, sleep
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http.response import HttpResponse
+from django.utils.encoding import force_bytes, force_text
+
+
+def get_view_path(view_class):
+    return '{}.{}'.format(view_class.__module__, view_class.__qualname__)
+
+
+def hash_items(items):
+    """Stable hash of `(name, value)` pairs which values are compared as
+    text so url captured strings match the values passed on invalidation.
+    """
+    return md5(force_bytes('&'.join(
+        '{}={}'.format(name, force_text(value))
+        for name, value in sorted(items)))).hexdigest()
+
+
+class ActionCache(object):
+
+    """Cache of the action results keyed by the view class, action name and
+    action parameters. Results differing by `vary_on` callables, which
+    receive the view instance, are invalidated together by bumping the
+    version stored for the action parameters.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, vary_on=(),
+            cache_alias='default', key_prefix='actionviews'):
+        self.timeout = timeout
+        self.vary_on = tuple(vary_on)
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_base_key(self, view_class, action_name, params):
+        return '{}:{}.{}:{}'.format(
+            self.key_prefix,
+            get_view_path(view_class),
+            action_name,
+            hash_items(params.items()))
+
+    @property
+    def versioned(self):
+        return bool(self.vary_on)
+
+    def get_version(self, base_key):
+        version_key = '{}:version'.format(base_key)
+        version = self.cache.get(version_key)
+
+        if version is None:
+            version = 1
+            self.cache.add(version_key, version, None)
+
+        return version
+
+    def get_vary_items(self, view):
+        return [(str(index), vary(view))
+            for index, vary in enumerate(self.vary_on)]
+
+    def get_key(self, view, action_name, params):
+        """Return cache key for the action called on the `view` instance with
+        `params`.
+        """
+        base_key = self.get_base_key(view.__class__, action_name, params)
+
+        if not self.versioned:
+            return base_key
+
+        return '{}:{}:{}'.format(
+            base_key,
+            self.get_version(base_key),
+            hash_items(self.get_vary_items(view)))
+
+    def get(self, view, action_name, params):
+        key = self.get_key(view, action_name, params)
+        return key, self.cache.get(key)
+
+    def set(self, key, result):
+
+        # responses short-circuiting actions aren't cached
+        if isinstance(result, dict):
+            self.cache.set(key, result, self.timeout)
+
+    def invalidate(self, view_class, action_name, params):
+        base_key = self.get_base_key(view_class, action_name, params)
+
+        if not self.versioned:
+            self.cache.delete(base_key)
+            return
+
+        try:
+            self.cache.incr('{}:version'.format(base_key))
+        except ValueError:
+            # there is nothing cached yet
+            pass
+
+
+class RenderCache(ActionCache):
+
+    """Cache of the rendered action content and headers keyed by the url
+    namespace and the view render variant, e.g. the negotiated renderer, too.
+    Entries are always versioned. While an entry is being rendered the other
+    requests wait up to `lock_wait` seconds for it instead of rendering the
+    same content.
+    """
+
+    versioned = True
+    poll_interval = 0.05
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, vary_on=(),
+            cache_alias='default', key_prefix='actionviews.render',
+            lock_timeout=30, lock_wait=5):
+        super(RenderCache, self).__init__(
+            timeout, vary_on, cache_alias, key_prefix)
+        self.lock_timeout = lock_timeout
+        self.lock_wait = lock_wait
+
+    def get_vary_items(self, view):
+        return ([('namespace', view.get_namespace())] +
+            view.get_render_vary_items() +
+            super(RenderCache, self).get_vary_items(view))
+
+    def acquire(self, key):
+        return self.cache.add(
+            '{}:lock'.format(key), 1, self.lock_timeout)
+
+    def release(self, key):
+        self.cache.delete('{}:lock'.format(key))
+
+    def wait(self, key):
+        """Return the entry rendered by the lock holder or None if it hasn't
+        been rendered in `lock_wait` seconds or the lock is gone.
+        """
+        deadline = perf_counter() + self.lock_wait
+        lock_key = '{}:lock'.format(key)
+
+        while perf_counter() < deadline:
+            sleep(self.poll_interval)
+            result = self.cache.get_many([key, lock_key])
+
+            if key in result:
+                return result[key]
+
+            if lock_key not in result:
+                return None
+
+        return None
+
+    def set(self, key, response):
+
+        # only complete successful responses are cached, cookies aren't
+        if response.status_code == 200 and not response.streaming:
+            self.cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'headers': [(header, value)
+                    for header, value in response.items()
+                    if header.lower() != 'content-type'],
+            }, self.timeout)
+
+    def make_response(self, result):
+        response = HttpResponse(
+            result['content'], content_type=result['content_type'])
+
+        for header, value in result.get('headers', ()):
+            response[header] = value
+
+        return response
+
+
+def invalidate_action(view_class, action_name, **params):
+    """Drop cached results and rendered content of `action_name` of
+    `view_class` called with `params`.
+    """
+    action = view_class.actions[action_name]
+
+    for cache_name in ('action_cache', 'render_cache'):
+        action_cache = getattr(action, cache_name, None)
+
+        if action_cache is not None:
+            action_cache.invalidate(view_class, action_name, params)
@@ -0,0 +1,67 @@
+"""Typed action parameters.
+
+Action parameters annotated with a type registered in `converters`, e.g.
+`int`, `uuid.UUID` or `datetime.date`, or with a converter object, e.g.
+`slug`, get the converter regex in the url and their values converted while
+the url is resolved. A value the converter rejects with ValueError doesn't
+match the url so malformed values end up with 404 response.
+"""
+import datetime
+import uuid
+
+
+class Converter(object):
+
+    """Url parameter converter. `regex` matches the parameter value and
+    `to_python` converts the matched string raising ValueError if it is
+    malformed.
+    """
+    __slots__ = ('regex', 'to_python')
+
+    def __init__(self, regex, to_python):
+        self.regex = regex
+        self.to_python = to_python
+
+    def __repr__(self):
+        return '<Converter {!r}>'.format(self.regex)
+
+
+def parse_date(value):
+    return datetime.date(*map(int, value.split('-')))
+
+
+int_converter = Converter(r'[0-9]+', int)
+uuid_converter = Converter(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
+    uuid.UUID)
+date_converter = Converter(r'[0-9]{4}-[0-9]{2}-[0-9]{2}', parse_date)
+slug = Converter(r'[-a-zA-Z0-9_]+', str)
+
+
+converters = {
+    int: int_converter,
+    uuid.UUID: uuid_converter,
+    datetime.date: date_converter,
+}
+
+
+def register(annotation, converter):
+    converters[annotation] = converter
+
+
+def get_converter(annotation):
+    """Converter of the parameter annotation or None for the regex strings.
+    """
+    if isinstance(annotation, str):
+        return None
+
+    try:
+        annotation = converters.get(annotation, annotation)
+    except TypeError:
+        # unhashable annotation
+        pass
+
+    if hasattr(annotation, 'regex') and hasattr(annotation, 'to_python'):
+        return annotation
+
+    return None
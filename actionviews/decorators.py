@@ -1,26 +1,46 @@
 from functools import update_wrapper, wraps
+import asyncio
+import inspect
 
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.core.exceptions import ImproperlyConfigured
 
 from actionviews.base import BaseView
+from actionviews.cache import ActionCache, RenderCache
+from actionviews.limits import ActionLimiter
 
 
 def action_decorator(view_decorator):
+    """Turn a view decorator into an action decorator. The view decorator is
+    applied once, the decorated view function receives the view instance
+    right after the request. The decorated async action stays async while
+    the view decorator may return a response instead of the coroutine.
+    """
 
     def decorator(func):
 
-        def wrapper(self, *args, **kwargs):
+        @view_decorator
+        def view_func(request, self, *args, **kwargs):
+            return func(self, *args, **kwargs)
 
-            @view_decorator
-            def view_func(request, *view_args, **view_kwargs):
-                return func(self, *view_args, **view_kwargs)
+        if asyncio.iscoroutinefunction(func):
 
-            return view_func(self.request, *args, **kwargs)
+            async def wrapper(self, *args, **kwargs):
+                result = view_func(self.request, self, *args, **kwargs)
+
+                if inspect.isawaitable(result):
+                    result = await result
+
+                return result
+
+        else:
+
+            def wrapper(self, *args, **kwargs):
+                return view_func(self.request, self, *args, **kwargs)
 
         # In case 'decorator' adds attributes to the function it decorates, we
-        # want to copy those. We don't have access to bound_func in this scope,
-        # but we can cheat by using it on a dummy function.
-        update_wrapper(wrapper, view_decorator(lambda *args, **kwargs: None))
+        # want to copy those.
+        update_wrapper(wrapper, view_func)
 
         # Need to preserve any existing attributes of 'func', including the
         # name.
@@ -43,6 +63,82 @@ def require_method(methods):
     return decorator
 
 
+def condition(etag_func=None, last_modified_func=None):
+    """Attach validators to the action. They are called with the view
+    instance and the url kwargs, parent actions parameters included, before
+    any action runs so a matching conditional GET gets 304 response.
+    """
+
+    def decorator(action):
+        action.etag_func = etag_func
+        action.last_modified_func = last_modified_func
+        return action
+
+    return decorator
+
+
+def etag(etag_func):
+    return condition(etag_func=etag_func)
+
+
+def last_modified(last_modified_func):
+    return condition(last_modified_func=last_modified_func)
+
+
+def head_handler(handler):
+    """Answer HEAD requests to the action with `handler` called with the view
+    instance and the url kwargs, parent actions parameters included, instead
+    of running the parent actions and the action. The handler returns a
+    headers dict, None or a response.
+    """
+
+    def decorator(action):
+        action.head_handler = handler
+        return action
+
+    return decorator
+
+
+def limit_concurrency(max_concurrency, timeout=0, status_code=503,
+        retry_after=1):
+    """Cap the action executions in flight in the process. Requests over the
+    limit wait up to `timeout` seconds and then get `status_code` response
+    with `Retry-After` header before the view is instantiated.
+    """
+    limiter = ActionLimiter(max_concurrency, timeout, status_code, retry_after)
+
+    def decorator(action):
+        action.limiter = limiter
+        return action
+
+    return decorator
+
+
+def loaders(**named_loaders):
+    """Add independent context loaders to the action. Loaders are called with
+    the view instance and the action parameters concurrently with the action
+    and each result is put to the context under the loader name.
+    """
+
+    def decorator(action):
+        action.loaders = named_loaders
+        return action
+
+    return decorator
+
+
+def render_with(*renderers):
+    """Set the renderers the action could be negotiated to, the first one is
+    the default.
+    """
+
+    def decorator(action):
+        action.renderers = renderers
+        return action
+
+    return decorator
+
+
 def child_view(view_klass):
 
     if not issubclass(view_klass, BaseView):
@@ -60,21 +156,105 @@ def form(form_class, form_name='form', **form_kwargs):
 
     def decorator(func):
 
-        @wraps(func)
-        def wrapper(self, *args, **kwargs):
+        def get_form(self):
             request = self.request
 
             if request.method == 'POST':
                 self.form = form_class(request.POST, **form_kwargs)
+                return self.form.is_valid()
+
+            self.form = form_class(**form_kwargs)
+            return False
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(self, *args, **kwargs):
+
+                if get_form(self):
+                    return await func(self, *args, **kwargs)
+
+                return {form_name: self.form}
 
-                if self.form.is_valid():
+        else:
+
+            @wraps(func)
+            def wrapper(self, *args, **kwargs):
+
+                if get_form(self):
                     return func(self, *args, **kwargs)
 
-            else:
-                self.form = form_class(**form_kwargs)
+                return {form_name: self.form}
 
-            return {form_name: self.form}
+        return wrapper
+
+    return decorator
+
+
+def cache_action(timeout=DEFAULT_TIMEOUT, vary_on=(), cache_alias='default',
+        key_prefix='actionviews'):
+    """Cache the dict returned by the action in the Django cache. The key is
+    built from the view class, action name and action parameters. Values
+    returned by `vary_on` callables receiving the view instance are added to
+    the key too. Use `actionviews.cache.invalidate_action` to drop cached
+    results.
+    """
+    action_cache = ActionCache(timeout, vary_on, cache_alias, key_prefix)
+
+    def decorator(func):
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                key, result = action_cache.get(
+                    self, getattr(wrapper, 'name', func.__name__), kwargs)
+
+                if result is None:
+                    result = await func(self, *args, **kwargs)
+                    action_cache.set(key, result)
+
+                return result
+
+        else:
+
+            @wraps(func)
+            def wrapper(self, *args, **kwargs):
+                key, result = action_cache.get(
+                    self, getattr(wrapper, 'name', func.__name__), kwargs)
+
+                if result is None:
+                    result = func(self, *args, **kwargs)
+                    action_cache.set(key, result)
+
+                return result
+
+        wrapper.action_cache = action_cache
 
         return wrapper
 
     return decorator
+
+
+def cache_render(timeout=DEFAULT_TIMEOUT, vary_on=(), cache_alias='default',
+        key_prefix='actionviews.render', lock_timeout=30, lock_wait=5):
+    """Cache the content rendered by `TemplateView` for the action. The key is
+    built from the url namespace, view class, action name, url kwargs and
+    values returned by `vary_on` callables receiving the view instance. A
+    hit skips parent actions, the action and rendering. Only one request
+    renders a missing entry while the others wait up to `lock_wait` seconds.
+    Use `actionviews.cache.invalidate_action` to drop the rendered content.
+    """
+    render_cache = RenderCache(
+        timeout, vary_on, cache_alias, key_prefix, lock_timeout, lock_wait)
+
+    def decorator(func):
+
+        if asyncio.iscoroutinefunction(func):
+            raise ImproperlyConfigured(
+                '`cache_render` decorator supports sync actions only')
+
+        func.render_cache = render_cache
+        return func
+
+    return decorator
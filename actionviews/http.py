@@ -0,0 +1,54 @@
+"""Conditional GET helpers for the actions validators."""
+import calendar
+
+from django.http.response import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe,\
+    quote_etag
+
+
+def get_timestamp(last_modified):
+    return last_modified and calendar.timegm(last_modified.utctimetuple())
+
+
+def is_not_modified(request, etag, last_modified):
+    """Check `If-None-Match` or, if it is absent, `If-Modified-Since` request
+    header against the validators.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        return etag is not None and (etag in etags or '*' in etags)
+
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'))
+
+    return bool(
+        if_modified_since and last_modified and
+        get_timestamp(last_modified) <= if_modified_since)
+
+
+def add_validators(response, etag, last_modified):
+
+    if etag is not None and not response.has_header('ETag'):
+        response['ETag'] = quote_etag(etag)
+
+    if last_modified is not None and not response.has_header(
+            'Last-Modified'):
+        response['Last-Modified'] = http_date(get_timestamp(last_modified))
+
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """Add `ETag` and `Last-Modified` headers to the successful response
+    unless they are set already.
+    """
+    if getattr(response, 'status_code', None) == 200:
+        add_validators(response, etag, last_modified)
+
+    return response
+
+
+def not_modified(etag, last_modified):
+    return add_validators(HttpResponseNotModified(), etag, last_modified)
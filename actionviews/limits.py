@@ -0,0 +1,125 @@
+"""Per action concurrency limits.
+
+Limiters are per process. Every limiter used by an action is registered by
+`'{module}.{view class}.{action name}'` label and `snapshot()` returns their
+state. The slot is held until a lazy template response is rendered or a
+streaming response is closed.
+"""
+from threading import BoundedSemaphore, Lock
+
+from django.http.response import HttpResponse
+
+
+limiters = {}
+
+
+class ActionLimiter(object):
+
+    """Cap of the action executions in flight. A request waits up to
+    `timeout` seconds for a free slot, async views never wait, and gets
+    `status_code` response with `Retry-After` header if there is none.
+    """
+
+    def __init__(self, max_concurrency, timeout=0, status_code=503,
+            retry_after=1):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.semaphore = BoundedSemaphore(max_concurrency)
+        self.lock = Lock()
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def acquire(self, blocking=True):
+
+        if blocking and self.timeout:
+            acquired = self.semaphore.acquire(timeout=self.timeout)
+        else:
+            acquired = self.semaphore.acquire(blocking=False)
+
+        with self.lock:
+
+            if acquired:
+                self.in_flight += 1
+                self.accepted += 1
+            else:
+                self.rejected += 1
+
+        return acquired
+
+    def release(self):
+
+        with self.lock:
+            self.in_flight -= 1
+
+        self.semaphore.release()
+
+    def reject(self):
+        response = HttpResponse(status=self.status_code)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+    def stats(self):
+
+        with self.lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'timeout': self.timeout,
+                'in_flight': self.in_flight,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+            }
+
+
+class SlotRelease(object):
+
+    """Callable releasing the slot held by a response once, either as a post
+    render callback or when the response is closed.
+    """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.released = False
+
+    def __call__(self, response=None):
+
+        if not self.released:
+            self.released = True
+            self.limiter.release()
+
+    def close(self):
+        self()
+
+
+def release_after(limiter, response):
+    """Keep the slot held until the lazy template response is rendered or the
+    streaming response is closed, release it right away otherwise. Closing
+    releases the slot of a template response which fails to render too.
+    """
+    streaming = getattr(response, 'streaming', False)
+    lazy = (hasattr(response, 'add_post_render_callback') and
+        not response.is_rendered)
+
+    if not streaming and not lazy:
+        limiter.release()
+        return
+
+    release = SlotRelease(limiter)
+    response._closable_objects.append(release)
+
+    if lazy:
+        response.add_post_render_callback(release)
+
+
+def register(label, limiter):
+    limiters[label] = limiter
+
+
+def snapshot():
+    """Return `{label: stats}` of the registered limiters where stats have
+    `max_concurrency`, `timeout` and the `in_flight`, `accepted` and
+    `rejected` executions counts.
+    """
+    return {label: limiter.stats() for label, limiter in limiters.items()}
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from actionviews.routes import analyze_routes
+
+
+class Command(BaseCommand):
+
+    help = (
+        'List all the routes of the url conf with their full regexes and '
+        'report shadowed and overlapping routes and regexes prone to '
+        'catastrophic backtracking.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf',
+            help='url conf module to analyze instead of ROOT_URLCONF')
+        parser.add_argument('--no-timing', action='store_false',
+            dest='timing', help='skip timing regexes on adversarial paths')
+        parser.add_argument('--budget', type=float, default=0.05,
+            help='seconds a regex may take to reject an adversarial path')
+        parser.add_argument('--strict', action='store_true',
+            help='fail if there are any findings')
+
+    def handle(self, *args, **options):
+        report = analyze_routes(
+            options['urlconf'], timing=options['timing'],
+            budget=options['budget'])
+
+        for route in report.routes:
+            self.stdout.write('{}\t{}\t{}'.format(
+                route.regex, route.label, route.name or ''))
+
+        for finding in report.findings:
+            self.stderr.write('{}: {} {}: {}'.format(
+                finding.kind, finding.label, finding.regex, finding.message))
+
+        if options['strict'] and report.findings:
+            raise CommandError(
+                '{} route findings'.format(len(report.findings)))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from actionviews.templates import warm_templates
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Load and compile the templates of all the actions routed by the url '
+        'conf and report the missing ones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf',
+            help='url conf module to walk instead of ROOT_URLCONF')
+        parser.add_argument('--strict', action='store_true',
+            help='fail if any action template is missing')
+
+    def handle(self, *args, **options):
+        report = warm_templates(options['urlconf'])
+
+        for label, template_names in report.missing:
+            self.stderr.write('Missing template of {}: {}'.format(
+                label, ', '.join(template_names)))
+
+        self.stdout.write('Loaded {} templates'.format(len(report.loaded)))
+
+        if options['strict'] and report.missing:
+            raise CommandError(
+                '{} action templates are missing'.format(len(report.missing)))
@@ -0,0 +1,190 @@
+"""Per action database queries accounting.
+
+`QueryAccounting` is a timing collector attributing the queries executed
+during every timed phase (`parent`, `action` and `render` where lazy
+querysets are evaluated) to the view class and action. Near identical
+statements repeated within a phase are reported as likely N+1 queries.
+
+Queries are taken from the debug cursor log of the connections. Enabled
+accounting forces the debug cursor of the connections and stamps the log
+entries with the time they were logged at.
+"""
+from collections import deque
+from threading import Lock
+from time import perf_counter
+import logging
+import re
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import timing
+
+
+logger = logging.getLogger('django.actionviews')
+
+
+class StampedQueriesLog(deque):
+
+    """Queries log adding `at` perf counter time to the entries."""
+
+    def append(self, query):
+        query['at'] = perf_counter()
+        super(StampedQueriesLog, self).append(query)
+
+
+def instrument_connection(connection):
+
+    if not isinstance(connection.queries_log, StampedQueriesLog):
+        connection.queries_log = StampedQueriesLog(
+            connection.queries_log, maxlen=connection.queries_log.maxlen)
+
+    connection.force_debug_cursor = True
+
+
+def get_queries_since(connection, since):
+    """Return queries logged by the connection after `since` time.
+    """
+    queries = []
+
+    for query in reversed(connection.queries_log):
+
+        if query.get('at', since) <= since:
+            break
+
+        queries.append(query)
+
+    queries.reverse()
+    return queries
+
+
+normalize_res = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_sql(sql):
+    """Replace literals of the statement so near identical statements are
+    equal.
+    """
+    for regex, replacement in normalize_res:
+        sql = regex.sub(replacement, sql)
+
+    return sql.strip()
+
+
+class QueryAccounting(object):
+
+    """Collector counting queries and their total time per view class, action
+    and phase. Statements repeated at least `repeat_threshold` times within
+    a phase are kept as N+1 suspects and logged. `using` limits accounting
+    to the database aliases.
+    """
+
+    def __init__(self, using=None, repeat_threshold=5):
+        self.using = using
+        self.repeat_threshold = repeat_threshold
+        self.lock = Lock()
+        self.reset()
+
+    def __call__(self, event):
+        since = event.started
+
+        if since is None:
+            since = perf_counter() - event.duration
+
+        until = since + event.duration
+        queries = [query for connection in self.get_connections()
+            for query in get_queries_since(connection, since)
+            if query['at'] <= until]
+
+        if not queries:
+            return
+
+        label = '{}.{}'.format(event.view_class.__name__, event.action_name)
+        repeats = {}
+
+        for query in queries:
+            sql = normalize_sql(query['sql'])
+            repeats[sql] = repeats.get(sql, 0) + 1
+
+        with self.lock:
+            stats = self.stats.get((label, event.phase))
+
+            if stats is None:
+                stats = self.stats[(label, event.phase)] = {
+                    'count': 0,
+                    'time': 0.0,
+                }
+
+            stats['count'] += len(queries)
+            stats['time'] += sum(float(query['time']) for query in queries)
+
+            for sql, count in repeats.items():
+
+                if count < self.repeat_threshold:
+                    continue
+
+                key = (label, event.phase, sql)
+                self.suspects[key] = max(self.suspects.get(key, 0), count)
+                logger.warning(
+                    'Likely N+1 queries in %s (%s): %d x %s',
+                    label, event.phase, count, sql)
+
+    def get_connections(self):
+
+        if self.using is None:
+            return connections.all()
+
+        return [connections[alias] for alias in self.using]
+
+    def connection_created(self, sender, connection, **kwargs):
+
+        if self.using is None or connection.alias in self.using:
+            instrument_connection(connection)
+
+    def enable(self):
+        """Instrument the connections of the current thread and the ones
+        created later and start collecting.
+        """
+        connection_created.connect(
+            self.connection_created, weak=False, dispatch_uid=id(self))
+
+        for connection in self.get_connections():
+            instrument_connection(connection)
+
+        timing.add_collector(self)
+
+    def disable(self):
+        timing.remove_collector(self)
+        connection_created.disconnect(dispatch_uid=id(self))
+
+        for connection in self.get_connections():
+            connection.force_debug_cursor = False
+
+    def reset(self):
+        self.stats = {}
+        self.suspects = {}
+
+    def snapshot(self):
+        """Return `{'View.action': {phase: stats}}` where stats have queries
+        `count` and their total `time`, and `n_plus_one` list of the suspect
+        statements with the highest number of repeats within a phase.
+        """
+        result = {}
+
+        with self.lock:
+
+            for (label, phase), stats in self.stats.items():
+                result.setdefault(label, {})[phase] = dict(
+                    stats, n_plus_one=[])
+
+            for (label, phase, sql), count in sorted(
+                    self.suspects.items(), key=lambda item: -item[1]):
+                result[label][phase]['n_plus_one'].append(
+                    {'sql': sql, 'repeats': count})
+
+        return result
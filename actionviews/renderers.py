@@ -0,0 +1,198 @@
+from collections import namedtuple
+from functools import lru_cache
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http.response import HttpResponse, StreamingHttpResponse
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+django_json_encoder = DjangoJSONEncoder()
+
+
+def stdlib_json_dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def orjson_dumps(data):
+    # keep the output the same as of the stdlib encoder: non-string keys are
+    # allowed and dates are formatted by `DjangoJSONEncoder`
+    return orjson.dumps(
+        data, default=django_json_encoder.default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+# use the faster encoder if it is installed
+json_dumps = orjson_dumps if orjson is not None else stdlib_json_dumps
+
+
+def stream_json_array(items, dumps):
+    """Encode `items` as JSON array chunk by chunk so the whole array never
+    has to be in memory.
+    """
+    yield '['
+    separator = ''
+
+    for item in items:
+        yield separator
+        yield dumps(item)
+        separator = ','
+
+    yield ']'
+
+
+class Renderer(object):
+
+    """Content negotiation renderer of the action context."""
+
+    media_type = None
+    format = None
+    available = True
+
+    def render(self, view, context, **response_kwargs):
+        raise NotImplementedError
+
+    def render_head(self, view, context, **response_kwargs):
+        response_kwargs.setdefault('content_type', self.media_type)
+        return HttpResponse(**response_kwargs)
+
+    def get_data(self, context):
+        """Parent actions results are merged into the context already so
+        `parents` are left out.
+        """
+        return {key: value for key, value in context.items()
+            if key != 'parents'}
+
+
+class JSONRenderer(Renderer):
+
+    media_type = 'application/json'
+    format = 'json'
+
+    def __init__(self, dumps=json_dumps):
+        self.dumps = dumps
+
+    def render(self, view, context, **response_kwargs):
+        response_kwargs.setdefault('content_type', self.media_type)
+
+        if view.rows is not None:
+            return StreamingHttpResponse(
+                stream_json_array(view.rows, self.dumps), **response_kwargs)
+
+        return HttpResponse(
+            self.dumps(self.get_data(context)), **response_kwargs)
+
+
+class MessagePackRenderer(Renderer):
+
+    """Compact binary renderer available if `msgpack` is installed."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    available = msgpack is not None
+
+    def render(self, view, context, **response_kwargs):
+        response_kwargs.setdefault('content_type', self.media_type)
+
+        if view.rows is not None:
+            data = list(view.rows)
+        else:
+            data = self.get_data(context)
+
+        return HttpResponse(msgpack.packb(
+            data, use_bin_type=True, default=django_json_encoder.default),
+            **response_kwargs)
+
+
+NegotiationTable = namedtuple(
+    'NegotiationTable', ['renderers', 'by_media_type', 'by_format'])
+
+
+def build_negotiation_table(renderers):
+    renderers = tuple(
+        renderer for renderer in renderers if renderer.available)
+
+    if not renderers:
+        raise ImproperlyConfigured('There are no renderers available')
+
+    by_media_type = {}
+    by_format = {}
+
+    for renderer in renderers:
+        by_media_type.setdefault(renderer.media_type, renderer)
+        by_format.setdefault(renderer.format, renderer)
+
+    return NegotiationTable(renderers, by_media_type, by_format)
+
+
+@lru_cache(maxsize=256)
+def parse_accept(accept):
+    """Return media ranges of `Accept` header value ordered by preference
+    omitting the ones with zero quality.
+    """
+    media_ranges = []
+
+    for index, item in enumerate(accept.split(',')):
+        media_range, _, params = item.partition(';')
+        quality = 1.0
+
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+
+            if name.strip() == 'q':
+
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        media_range = media_range.strip().lower()
+
+        if media_range and quality > 0:
+            # prefer higher quality then more specific range then order
+            media_ranges.append(
+                (-quality, media_range.count('*'), index, media_range))
+
+    return tuple(item[-1] for item in sorted(media_ranges))
+
+
+def negotiate(table, accept=None, format=None):
+    """Choose renderer from the table by `format` or by `Accept` header value.
+    Returns None if there is no acceptable renderer.
+    """
+    if format:
+        return table.by_format.get(format)
+
+    if not accept:
+        return table.renderers[0]
+
+    for media_range in parse_accept(accept):
+
+        if media_range == '*/*':
+            return table.renderers[0]
+
+        if media_range.endswith('/*'):
+
+            for renderer in table.renderers:
+
+                if renderer.media_type.startswith(media_range[:-1]):
+                    return renderer
+
+            continue
+
+        renderer = table.by_media_type.get(media_range)
+
+        if renderer is not None:
+            return renderer
+
+    return None
@@ -0,0 +1,189 @@
+from time import perf_counter
+import re
+
+from django.core.urlresolvers import RegexURLPattern, RegexURLResolver,\
+    ResolverMatch, Resolver404
+from django.utils.encoding import force_text
+from django.utils.functional import cached_property
+
+from . import timing
+
+
+# literal first path segment of a pattern regex, e.g. `detail` of
+# `^detail/pk/(?P<pk>\d+)/$`
+literal_prefix_re = re.compile(r'^\^([\w-]+)[/$]')
+
+
+def convert_kwargs(converters, kwargs):
+    """Convert the captured url kwargs in place with `(name, converter)`
+    pairs. Values which aren't strings, e.g. defaults or values converted by
+    a nested pattern, are left as is. Raises ValueError for malformed values.
+    """
+    for name, converter in converters:
+        value = kwargs.get(name)
+
+        if isinstance(value, str):
+            kwargs[name] = converter.to_python(value)
+
+
+class ActionURLPattern(RegexURLPattern):
+
+    """Action url pattern converting typed parameters. The pattern doesn't
+    match if any value is malformed.
+    """
+
+    def __init__(self, regex, callback, default_args=None, name=None,
+            converters=()):
+        super(ActionURLPattern, self).__init__(
+            regex, callback, default_args, name)
+        self.converters = converters
+
+    def resolve(self, path):
+        match = super(ActionURLPattern, self).resolve(path)
+
+        if match and self.converters:
+
+            try:
+                convert_kwargs(self.converters, match.kwargs)
+            except ValueError:
+                return None
+
+        return match
+
+
+class ConvertingURLResolver(RegexURLResolver):
+
+    """Child view include converting typed parameters of the parent action.
+    """
+
+    def __init__(self, regex, urlconf_name, default_kwargs=None,
+            app_name=None, namespace=None, converters=()):
+        super(ConvertingURLResolver, self).__init__(
+            regex, urlconf_name, default_kwargs, app_name, namespace)
+        self.converters = converters
+
+    def resolve(self, path):
+        match = super(ConvertingURLResolver, self).resolve(path)
+
+        if self.converters:
+
+            try:
+                convert_kwargs(self.converters, match.kwargs)
+            except ValueError:
+                raise Resolver404({'path': path})
+
+        return match
+
+
+class ActionURLResolver(ConvertingURLResolver):
+
+    """Resolver matching all the actions of a view in a single pass.
+
+    Patterns are bucketed by the literal first path segment of their regex
+    so only the patterns which could match the path are tried. Patterns
+    without a literal prefix are tried for every path keeping the original
+    patterns order.
+    """
+
+    def __init__(self, regex, url_patterns, default_kwargs=None,
+            view_class=None, converters=()):
+        super(ActionURLResolver, self).__init__(
+            regex, url_patterns, default_kwargs, converters=converters)
+        self.view_class = view_class
+
+    @cached_property
+    def candidates(self):
+        """First path segment to candidate patterns mapping along with the
+        list of the patterns to try for the other paths.
+        """
+        buckets = {}
+        fallback = []
+
+        for pattern in self.url_patterns:
+            regex = pattern.regex.pattern
+            match = literal_prefix_re.match(regex)
+
+            if match is None or '|' in regex:
+                fallback.append(pattern)
+
+                for bucket in buckets.values():
+                    bucket.append(pattern)
+            else:
+                buckets.setdefault(
+                    match.group(1), list(fallback)).append(pattern)
+
+        return buckets, fallback
+
+    def resolve(self, path):
+        started = timing.collectors and perf_counter()
+        path = force_text(path)  # path may be a reverse_lazy object
+        tried = []
+        match = self.regex.search(path)
+
+        if not match:
+            raise Resolver404({'path': path})
+
+        new_path = path[match.end():]
+        buckets, fallback = self.candidates
+
+        for pattern in buckets.get(new_path.partition('/')[0], fallback):
+
+            try:
+                sub_match = pattern.resolve(new_path)
+            except Resolver404 as e:
+                sub_tried = e.args[0].get('tried')
+
+                if sub_tried is not None:
+                    tried.extend([pattern] + t for t in sub_tried)
+                else:
+                    tried.append([pattern])
+
+                continue
+
+            if not sub_match:
+                tried.append([pattern])
+                continue
+
+            # merge captured arguments in match with submatch
+            sub_match_dict = dict(match.groupdict(), **self.default_kwargs)
+            sub_match_dict.update(sub_match.kwargs)
+
+            # if there are any named groups, ignore all non-named groups
+            sub_match_args = sub_match.args
+
+            if not sub_match_dict:
+                sub_match_args = match.groups() + sub_match.args
+
+            if self.converters:
+
+                try:
+                    convert_kwargs(self.converters, sub_match_dict)
+                except ValueError:
+                    raise Resolver404({'path': path})
+
+            if started and self.view_class is not None:
+                timing.emit(
+                    self.view_class, sub_match.url_name, 'match', started)
+
+            return ResolverMatch(
+                sub_match.func,
+                sub_match_args,
+                sub_match_dict,
+                sub_match.url_name,
+                [self.app_name] + sub_match.app_names,
+                [self.namespace] + sub_match.namespaces)
+
+        raise Resolver404({'tried': tried, 'path': new_path})
+
+
+def walk_url_patterns(url_patterns, resolvers=()):
+    """Yield url patterns along with the tuple of the resolvers they are
+    included with, outermost first.
+    """
+    for pattern in url_patterns:
+
+        if isinstance(pattern, RegexURLResolver):
+            yield from walk_url_patterns(
+                pattern.url_patterns, resolvers + (pattern,))
+        else:
+            yield resolvers, pattern
@@ -0,0 +1,418 @@
+"""Route table analysis.
+
+`analyze_routes()` dumps every route of the url conf, child view includes
+included, and reports:
+
+- `shadowed` and `overlap` routes: a route which sample paths are all or
+  partially matched by a route tried before it;
+- `backtracking` regexes: nested variable quantifiers or quantified
+  alternatives sharing the first characters, e.g. `(\\w+)+` or `(a|aa)+`,
+  in the parameter annotations and `default_group_regex` of the actions and
+  in the other route regexes;
+- `slow` regexes: the ones which take longer than `budget` seconds to
+  reject an adversarial path built by pumping a group.
+
+Overlaps are found with generated sample paths so they are heuristic.
+"""
+from collections import namedtuple
+from time import perf_counter
+import inspect
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover
+    # python < 3.11
+    import sre_constants
+    import sre_parse
+
+from django.core.urlresolvers import get_resolver
+
+from .resolvers import walk_url_patterns
+
+
+Route = namedtuple('Route', [
+    'regex',  # full regex of the route levels
+    'levels',  # compiled regexes of the resolvers and the pattern
+    'name',  # url name or None
+    'label',  # `View.action` or the callback name
+    'params',  # `(param name, group regex, source)` of the action params
+])
+
+Finding = namedtuple('Finding', ['kind', 'label', 'regex', 'message'])
+
+RouteReport = namedtuple('RouteReport', ['routes', 'findings'])
+
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+# characters tried to generate sample paths and find the first characters
+SAMPLE_CHARS = 'a1_-.A~ !/\n'
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda char: not char.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda char: not char.isspace(),
+    sre_constants.CATEGORY_WORD: lambda char: char.isalnum() or char == '_',
+    sre_constants.CATEGORY_NOT_WORD:
+        lambda char: not (char.isalnum() or char == '_'),
+}
+
+
+def in_set(items, char):
+    """Check `char` against the items of parsed character set."""
+    negate = False
+
+    for op, av in items:
+
+        if op == sre_constants.NEGATE:
+            negate = True
+        elif op == sre_constants.LITERAL and char == chr(av):
+            return not negate
+        elif op == sre_constants.RANGE and av[0] <= ord(char) <= av[1]:
+            return not negate
+        elif op == sre_constants.CATEGORY and CATEGORIES.get(
+                av, lambda char: False)(char):
+            return not negate
+
+    return negate
+
+
+def first_chars(parsed):
+    """Sample characters the parsed regex could start a match with."""
+    for op, av in parsed:
+
+        if op == sre_constants.AT:
+            continue
+
+        if op == sre_constants.LITERAL:
+            return {chr(av)}
+
+        if op == sre_constants.NOT_LITERAL:
+            return {char for char in SAMPLE_CHARS if char != chr(av)}
+
+        if op == sre_constants.ANY:
+            return set(SAMPLE_CHARS) - {'\n'}
+
+        if op == sre_constants.IN:
+            return {char for char in SAMPLE_CHARS if in_set(av, char)}
+
+        if op == sre_constants.SUBPATTERN:
+            return first_chars(av[-1])
+
+        if op == sre_constants.BRANCH:
+            return set().union(*map(first_chars, av[1]))
+
+        if op in REPEATS:
+            return first_chars(av[2])
+
+        return set()
+
+    return set()
+
+
+def sample(parsed, overrides=None, extra=0):
+    """Generate a string matching the parsed regex using `overrides` strings
+    in place of the groups with the keyed numbers. Repeats are taken `extra`
+    times more than their minimum, at least once, where allowed.
+    """
+    overrides = overrides or {}
+    chunks = []
+
+    for op, av in parsed:
+
+        if op == sre_constants.LITERAL:
+            chunks.append(chr(av))
+        elif op in (sre_constants.NOT_LITERAL, sre_constants.ANY,
+                sre_constants.IN):
+            chunks.append(min(first_chars([(op, av)]) or {'a'}))
+        elif op == sre_constants.SUBPATTERN:
+
+            if av[0] in overrides:
+                chunks.append(overrides[av[0]])
+            else:
+                chunks.append(sample(av[-1], overrides, extra))
+        elif op == sre_constants.BRANCH:
+            chunks.append(sample(av[1][0], overrides, extra))
+        elif op in REPEATS:
+            count = min(max(av[0], 1) + extra, av[1])
+            chunks.append(sample(av[2], overrides, extra) * count)
+
+    return ''.join(chunks)
+
+
+def find_backtracking(parsed, in_repeat=False):
+    """Return description of the first nested variable quantifier or the
+    quantified alternatives sharing the first characters, or None.
+    """
+    for op, av in parsed:
+
+        if op in REPEATS:
+            min_count, max_count, sub = av
+
+            if max_count > 1 and max_count != min_count:
+
+                if in_repeat:
+                    return 'nested quantifiers'
+
+                for sub_op, sub_av in sub:
+                    alternatives = None
+
+                    if sub_op == sre_constants.BRANCH:
+                        alternatives = sub_av[1]
+                    elif sub_op == sre_constants.SUBPATTERN and any(
+                            item[0] == sre_constants.BRANCH
+                            for item in sub_av[-1]):
+                        alternatives = next(
+                            item[1][1] for item in sub_av[-1]
+                            if item[0] == sre_constants.BRANCH)
+
+                    if alternatives and has_common_first_chars(alternatives):
+                        return 'quantified overlapping alternatives'
+
+                found = find_backtracking(sub, True)
+            else:
+                found = find_backtracking(sub, in_repeat)
+        elif op == sre_constants.SUBPATTERN:
+            found = find_backtracking(av[-1], in_repeat)
+        elif op == sre_constants.BRANCH:
+            found = next(filter(None, (
+                find_backtracking(alternative, in_repeat)
+                for alternative in av[1])), None)
+        else:
+            found = None
+
+        if found:
+            return found
+
+    return None
+
+
+def has_common_first_chars(alternatives):
+    """Check whether the alternatives could start with the same character.
+    Common prefix of the alternatives is factored out by the regex parser
+    leaving an empty alternative, e.g. `(a|aa)` is parsed as `a(|a)`, and
+    the alternatives of single characters are merged to a character set.
+    """
+    if not all(alternatives):
+        return True
+
+    seen = set()
+
+    for alternative in alternatives:
+        chars = first_chars(alternative)
+
+        if seen & chars:
+            return True
+
+        seen |= chars
+
+    return False
+
+
+def get_route_label(callback):
+    view_class = getattr(callback, 'view_class', None)
+    plan = getattr(callback, 'plan', None)
+
+    if plan is not None:
+        return '{}.{}'.format(view_class.__name__, plan.name)
+
+    return getattr(callback, '__qualname__', repr(callback))
+
+
+def get_route_params(callback):
+    """`(param name, group regex, source)` of the action url parameters where
+    source is `annotation`, `converter` or `default_group_regex`.
+    """
+    view_class = getattr(callback, 'view_class', None)
+    plan = getattr(callback, 'plan', None)
+
+    if plan is None:
+        return ()
+
+    params = []
+    converters = dict(plan.converters)
+
+    for parameter in plan.params:
+
+        if parameter.annotation is inspect._empty:
+            params.append((parameter.name, view_class.default_group_regex,
+                'default_group_regex'))
+        elif parameter.name in converters:
+            params.append((parameter.name, converters[parameter.name].regex,
+                'converter'))
+        elif isinstance(parameter.annotation, str):
+            params.append(
+                (parameter.name, parameter.annotation, 'annotation'))
+
+    return tuple(params)
+
+
+def iter_routes(urlconf=None):
+    """Yield `Route` for every url pattern in the order they are tried."""
+    for resolvers, pattern in walk_url_patterns(
+            get_resolver(urlconf).url_patterns):
+        levels = tuple(
+            item.regex for item in resolvers + (pattern,))
+
+        yield Route(
+            regex='^{}'.format(''.join(
+                level.pattern.lstrip('^') for level in levels)),
+            levels=levels,
+            name=pattern.name,
+            label=get_route_label(pattern.callback),
+            params=get_route_params(pattern.callback))
+
+
+def route_matches(route, path):
+    """Match `path` level by level as the url resolvers do."""
+    for level in route.levels:
+        match = level.search(path)
+
+        if match is None:
+            return False
+
+        path = path[match.end():]
+
+    return True
+
+
+def get_samples(route):
+    """Shortest and longer sample paths matching the route."""
+    levels = [sre_parse.parse(level.pattern) for level in route.levels]
+
+    return [''.join(sample(parsed, extra=extra) for parsed in levels)
+        for extra in (0, 2)]
+
+
+def time_regex(regex, lengths, budget):
+    """Time rejecting adversarial strings made by pumping every group of the
+    regex with characters it accepts. Returns the worst `(seconds, length)`.
+    Pumping stops once an attempt exceeds `budget` seconds.
+    """
+    parsed = sre_parse.parse(regex.pattern)
+    worst = (0.0, 0)
+
+    for group in range(1, regex.groups + 1):
+        group_parsed = find_group(parsed, group)
+        chars = group_parsed and sorted(first_chars(group_parsed))
+
+        if not chars:
+            continue
+
+        fail_char = next(
+            (char for char in '!\n/' if char not in chars), '\n')
+
+        for length in lengths:
+            path = sample(parsed, {group: chars[0] * length + fail_char})
+            started = perf_counter()
+            regex.search(path)
+            elapsed = perf_counter() - started
+
+            if elapsed > worst[0]:
+                worst = (elapsed, length)
+
+            if elapsed > budget:
+                break
+
+    return worst
+
+
+def find_group(parsed, group):
+
+    for op, av in parsed:
+        found = None
+
+        if op == sre_constants.SUBPATTERN:
+
+            if av[0] == group:
+                return av[-1]
+
+            found = find_group(av[-1], group)
+        elif op == sre_constants.BRANCH:
+            found = next(filter(None, (
+                find_group(alternative, group) for alternative in av[1])),
+                None)
+        elif op in REPEATS:
+            found = find_group(av[2], group)
+
+        if found is not None:
+            return found
+
+    return None
+
+
+def analyze_routes(urlconf=None, timing=True, lengths=(8, 16, 20, 24),
+        budget=0.05):
+    """Return `RouteReport` of the routes of `urlconf` and the findings.
+    """
+    routes = list(iter_routes(urlconf))
+    findings = []
+
+    for index, route in enumerate(routes):
+        samples = get_samples(route)
+
+        for previous in routes[:index]:
+            matched = [route_matches(previous, path) for path in samples]
+
+            if all(matched):
+                findings.append(Finding(
+                    'shadowed', route.label, route.regex,
+                    'shadowed by {} {}'.format(
+                        previous.label, previous.regex)))
+                break
+
+            if any(matched):
+                findings.append(Finding(
+                    'overlap', route.label, route.regex,
+                    'overlaps {} {}'.format(previous.label, previous.regex)))
+
+    checked = set()
+
+    for route in routes:
+
+        for name, group_regex, source in route.params:
+            problem = find_backtracking(sre_parse.parse(group_regex))
+
+            if problem:
+                findings.append(Finding(
+                    'backtracking', route.label, group_regex,
+                    '{} in {} of `{}` parameter'.format(
+                        problem, source, name)))
+                checked.add(group_regex)
+
+        for level in route.levels:
+
+            if level.pattern in checked:
+                continue
+
+            checked.add(level.pattern)
+            problem = find_backtracking(sre_parse.parse(level.pattern))
+
+            if problem and not any(
+                    finding.label == route.label and
+                        finding.kind == 'backtracking'
+                    for finding in findings):
+                findings.append(Finding(
+                    'backtracking', route.label, level.pattern, problem))
+
+    if timing:
+        timed = set()
+
+        for route in routes:
+
+            for level in route.levels:
+
+                if level.pattern in timed:
+                    continue
+
+                timed.add(level.pattern)
+                seconds, length = time_regex(level, lengths, budget)
+
+                if seconds > budget:
+                    findings.append(Finding(
+                        'slow', route.label, level.pattern,
+                        '{:.3f}s to reject {} pumped characters'.format(
+                            seconds, length)))
+
+    return RouteReport(routes, findings)
@@ -0,0 +1,85 @@
+"""Action templates warm up.
+
+Call `warm_templates()` in a prefork server master process, e.g. in the
+WSGI module, or run `warm_templates` management command so the templates
+are compiled by the cached template loader before the workers are forked.
+"""
+from collections import namedtuple
+import os
+
+from django.core.urlresolvers import get_resolver
+from django.template import TemplateDoesNotExist
+from django.template.loader import select_template
+
+from .base import StreamingTemplateResponseMixin, TemplateResponseMixin,\
+    format_template_names
+from .resolvers import walk_url_patterns
+
+
+WarmUpReport = namedtuple('WarmUpReport', [
+    'loaded',  # names of the loaded templates
+    'missing',  # `('View.action', template names)` of the missing ones
+])
+
+
+def get_part_names(template_names, suffix):
+    return tuple('{}{}{}'.format(name, suffix, ext) for name, ext in
+        map(os.path.splitext, template_names))
+
+
+def iter_action_templates(urlconf=None):
+    """Yield `(label, template names, required)` for the templates of all the
+    template views actions routed by `urlconf` in every namespace they are
+    included with. Streaming head and tail templates aren't required.
+    """
+    for resolvers, pattern in walk_url_patterns(
+            get_resolver(urlconf).url_patterns):
+        view_class = getattr(pattern.callback, 'view_class', None)
+        plan = getattr(pattern.callback, 'plan', None)
+
+        if plan is None or not issubclass(view_class, TemplateResponseMixin):
+            continue
+
+        label = '{}.{}'.format(view_class.__name__, plan.name)
+        template_names = format_template_names(
+            view_class.template_name,
+            ':'.join(resolver.namespace for resolver in resolvers
+                if resolver.namespace),
+            view_class.__name__,
+            plan.name)
+
+        yield label, template_names, True
+
+        if issubclass(view_class, StreamingTemplateResponseMixin):
+
+            for suffix in (view_class.head_suffix, view_class.tail_suffix):
+                yield label, get_part_names(template_names, suffix), False
+
+
+def warm_templates(urlconf=None):
+    """Load the action templates, see `iter_action_templates`, and return
+    `WarmUpReport`.
+    """
+    loaded = []
+    missing = []
+    seen = set()
+
+    for label, template_names, required in iter_action_templates(urlconf):
+
+        if template_names in seen:
+            continue
+
+        seen.add(template_names)
+
+        try:
+            template = select_template(template_names)
+        except TemplateDoesNotExist:
+
+            if required:
+                missing.append((label, template_names))
+
+            continue
+
+        loaded.append(template.template.name)
+
+    return WarmUpReport(loaded, missing)
@@ -0,0 +1,101 @@
+"""Per action timing instrumentation.
+
+Collectors are callables receiving `TimingEvent` for every timed phase of a
+request: `match` (single pass resolving), `parent` (parent action), `action`,
+`short_circuit` (a response raised or returned by an action) and `render`.
+Timing is skipped entirely while no collector is registered.
+"""
+from collections import namedtuple
+from threading import Lock
+from time import perf_counter
+
+
+TimingEvent = namedtuple(
+    'TimingEvent',
+    ['view_class', 'action_name', 'phase', 'duration', 'started'])
+# `started` perf counter time is optional
+TimingEvent.__new__.__defaults__ = (None,)
+
+
+collectors = []
+
+
+def add_collector(collector):
+    collectors.append(collector)
+
+
+def remove_collector(collector):
+    collectors.remove(collector)
+
+
+def emit(view_class, action_name, phase, started):
+    """Send event for the phase which has been `started` at `perf_counter()`
+    time to all the collectors.
+    """
+    event = TimingEvent(
+        view_class, action_name, phase, perf_counter() - started, started)
+
+    for collector in collectors:
+        collector(event)
+
+
+class TimingAggregator(object):
+
+    """Collector counting events and building duration histograms per view
+    class, action and phase.
+    """
+
+    buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float('inf'))
+
+    def __init__(self, buckets=None):
+
+        if buckets is not None:
+            self.buckets = tuple(buckets)
+
+        self.lock = Lock()
+        self.reset()
+
+    def __call__(self, event):
+        key = (
+            '{}.{}'.format(event.view_class.__name__, event.action_name),
+            event.phase)
+
+        with self.lock:
+            stats = self.stats.get(key)
+
+            if stats is None:
+                stats = self.stats[key] = {
+                    'count': 0,
+                    'sum': 0.0,
+                    'buckets': [0] * len(self.buckets),
+                }
+
+            stats['count'] += 1
+            stats['sum'] += event.duration
+
+            for index, bound in enumerate(self.buckets):
+
+                if event.duration <= bound:
+                    stats['buckets'][index] += 1
+                    break
+
+    def reset(self):
+        self.stats = {}
+
+    def snapshot(self):
+        """Return `{'View.action': {phase: stats}}` where stats have events
+        `count`, durations `sum` and `buckets` as `(upper bound, count)`
+        pairs.
+        """
+        result = {}
+
+        with self.lock:
+
+            for (label, phase), stats in self.stats.items():
+                result.setdefault(label, {})[phase] = {
+                    'count': stats['count'],
+                    'sum': stats['sum'],
+                    'buckets': list(zip(self.buckets, stats['buckets'])),
+                }
+
+        return result
@@ -0,0 +1,5 @@
+"""Benchmarks for the actionviews hot paths.
+
+Run with `python -m benchmarks` from the repository root. Use `--save` to
+store the results as a baseline and `--compare` to check against it.
+"""
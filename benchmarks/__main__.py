@@ -0,0 +1,60 @@
+from os import path
+import argparse
+import sys
+
+import django
+from django.conf import settings
+
+
+def configure():
+    settings.configure(
+        DATABASES={'default': {'ENGINE': 'django.db.backends.dummy'}},
+        TEMPLATE_DIRS=(path.join(path.dirname(__file__), 'templates'),),
+        TEMPLATE_CONTEXT_PROCESSORS=(),
+    )
+
+    if hasattr(django, 'setup'):
+        django.setup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('-k', dest='pattern', default='',
+        help='run only benchmarks which names contain the pattern')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--number', type=int, default=200,
+        help='calls per round')
+    parser.add_argument('--save', metavar='PATH',
+        help='store results as a baseline')
+    parser.add_argument('--compare', metavar='PATH',
+        help='compare results against a stored baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+        help='ops/sec drop fraction treated as a regression')
+    args = parser.parse_args(argv)
+
+    configure()
+
+    from . import bench_views  # @UnusedImport register benchmarks
+    from . import runner
+
+    results = runner.run(args.pattern, args.rounds, args.number)
+    baseline = args.compare and runner.load(args.compare)
+
+    print(runner.report(results, baseline))
+
+    if args.save:
+        runner.save(results, args.save)
+
+    if baseline:
+        regressions = runner.compare(results, baseline, args.threshold)
+
+        for name in regressions:
+            print('regression: {}'.format(name))
+
+        return bool(regressions)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+from django.conf.urls import patterns, url
+from django.core.urlresolvers import resolve, set_urlconf
+from django.http.response import HttpResponse
+from django.test.client import RequestFactory
+
+from actionviews.base import View, TemplateView
+from actionviews.decorators import child_view
+
+from .runner import benchmark
+
+
+request_factory = RequestFactory()
+
+
+def make_view_class(base, action_count, param_count=0, **attrs):
+    """Build view class with `action_count` actions taking `param_count`
+    parameters each.
+    """
+    params = ', '.join('p{}'.format(index) for index in range(param_count))
+    namespace = {'__name__': __name__}
+
+    for index in range(action_count):
+        exec(
+            'def do_action{index}(self, {params}):\n'
+            '    return {{}}\n'.format(index=index, params=params),
+            namespace)
+
+    attrs.update(
+        (name, value) for name, value in namespace.items()
+        if name.startswith('do_'))
+
+    return type(base)('BenchView', (base,), attrs)
+
+
+def use_urls(urls):
+    set_urlconf(type('urlconf', (), {'urlpatterns': patterns('', *urls)}))
+
+
+@benchmark('class_creation', actions=[1, 10, 50], params=[0, 3])
+def class_creation(actions, params):
+
+    def create():
+        # access urls as class creation is lazy
+        make_view_class(View, actions, params).urls
+
+    return create
+
+
+@benchmark('resolve', actions=[1, 10, 50], single_pass=[False, True])
+def resolve_last_action(actions, single_pass):
+    view_class = make_view_class(
+        View, actions, 1, single_pass_urls=single_pass)
+    use_urls(view_class.urls)
+    path = '/action{}/p0/1/'.format(actions - 1)
+
+    return lambda: resolve(path)
+
+
+class DispatchView(View):
+
+    def get(self, request, *args, **kwargs):
+        self.get_context_data(**kwargs)
+        return HttpResponse()
+
+    def do_index(self:''):
+        return {}
+
+
+class CompactDispatchView(View):
+    compact_instances = True
+
+    # every class of the hierarchy has to have slots
+    get = DispatchView.get
+    do_index = DispatchView.do_index
+
+
+def plain_view(request):
+    return HttpResponse()
+
+
+@benchmark('dispatch', view=['plain', 'action', 'compact'])
+def dispatch(view):
+    request = request_factory.get('/')
+
+    if view == 'plain':
+        callback = plain_view
+    elif view == 'compact':
+        callback = CompactDispatchView.urls[0].callback
+    else:
+        callback = DispatchView.urls[0].callback
+
+    return lambda: callback(request)
+
+
+@benchmark('fast_path', method=['OPTIONS', 'DELETE'])
+def fast_path(method):
+    request = request_factory.generic(method, '/')
+    callback = DispatchView.urls[0].callback
+
+    return lambda: callback(request)
+
+
+def make_parent_action(level):
+    namespace = {'__name__': __name__}
+    exec(
+        'def do_index(self, pk{0}):\n'
+        '    return {{"level{0}": pk{0}}}\n'.format(level),
+        namespace)
+    return namespace['do_index']
+
+
+@benchmark('parent_chain', depth=[0, 1, 2, 3])
+def parent_chain(depth):
+    view_class = DispatchView
+    path = '/'
+
+    for level in range(depth):
+        view_class = type(View)('Parent{}View'.format(level), (View,), {
+            'do_index': child_view(view_class)(make_parent_action(level)),
+        })
+        path = '/index/pk{0}/{0}{1}'.format(level, path)
+
+    use_urls(view_class.urls)
+    resolver_match = resolve(path)
+    request = request_factory.get(path)
+
+    def call():
+        # drop parent results memoized for the previous call
+        request.__dict__.pop('action_parents', None)
+        request.__dict__.pop('action_parent_results', None)
+        resolver_match.func(request, **resolver_match.kwargs)
+
+    return call
+
+
+class BenchTemplateView(TemplateView):
+
+    def do_index(self:'', size:r'\d+'):
+        return {'items': range(int(size))}
+
+
+@benchmark('template_render', size=[10, 1000])
+def template_render(size):
+    use_urls([url(r'^', BenchTemplateView.urls[0].callback)])
+    view = BenchTemplateView.urls[0].callback
+    request = request_factory.get('/')
+
+    return lambda: view(request, size=size).render()
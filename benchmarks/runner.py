@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from time import perf_counter
+import gc
+import json
+import math
+import tracemalloc
+
+
+registry = OrderedDict()
+
+
+def benchmark(name, **params):
+    """Register benchmark factory. The factory receives `params` and returns
+    a callable with no arguments to be timed. Each `params` value may be a
+    list to register a benchmark per value.
+    """
+
+    def decorator(factory):
+        variants = [{}]
+
+        for param_name, values in params.items():
+
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+
+            variants = [dict(variant, **{param_name: value})
+                for variant in variants for value in values]
+
+        for variant in variants:
+            full_name = '{}[{}]'.format(name, ','.join(
+                '{}={}'.format(*item) for item in sorted(variant.items())))
+            registry[full_name.replace('[]', '')] = (factory, variant)
+
+        return factory
+
+    return decorator
+
+
+def percentile(sorted_values, percent):
+    index = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(index)
+    upper = math.ceil(index)
+    return (sorted_values[lower] +
+        (sorted_values[upper] - sorted_values[lower]) * (index - lower))
+
+
+def gc_collections():
+    return sum(stats['collections'] for stats in gc.get_stats())
+
+
+def measure_allocations(func, number):
+    """Return peak bytes allocated by a call of `func` averaged over `number`
+    calls.
+    """
+    peak = 0
+    tracemalloc.start()
+
+    try:
+
+        for _ in range(number):
+            # clearing traces resets the peak too
+            tracemalloc.clear_traces()
+            func()
+            peak += tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peak / number
+
+
+def measure(func, rounds, number):
+    """Time `rounds` rounds of `number` calls of `func` after warming it up
+    and return ops/sec, per call latency percentiles in microseconds, peak
+    bytes allocated per call and garbage collections per thousand calls.
+    Every call is timed on its own so the percentiles show the tail latency
+    rather than the spread of the round means.
+    """
+    for _ in range(number):
+        func()
+
+    timings = []
+    collections = gc_collections()
+
+    for _ in range(rounds):
+
+        for _ in range(number):
+            started = perf_counter()
+            func()
+            timings.append(perf_counter() - started)
+
+    collections = gc_collections() - collections
+    timings.sort()
+
+    return OrderedDict([
+        ('ops', len(timings) / sum(timings)),
+        ('p50', percentile(timings, 50) * 1e6),
+        ('p90', percentile(timings, 90) * 1e6),
+        ('p99', percentile(timings, 99) * 1e6),
+        ('alloc', measure_allocations(func, number)),
+        ('gc', collections * 1000 / (rounds * number)),
+    ])
+
+
+def run(pattern='', rounds=20, number=200):
+    results = OrderedDict()
+
+    for name, (factory, params) in registry.items():
+
+        if pattern in name:
+            func = factory(**params)
+            results[name] = measure(func, rounds, number)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return names of benchmarks which ops/sec dropped more than `threshold`
+    fraction below the baseline.
+    """
+    return [name for name, result in results.items()
+        if name in baseline and
+            result['ops'] < baseline[name]['ops'] * (1 - threshold)]
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def report(results, baseline=None):
+    lines = [
+        '{:<52} {:>12} {:>10} {:>10} {:>10} {:>10} {:>8} {:>8}'.format(
+            'benchmark', 'ops/sec', 'p50 us', 'p90 us', 'p99 us',
+            'alloc B', 'gc/1k', 'change')]
+
+    for name, result in results.items():
+
+        if baseline and name in baseline:
+            change = '{:+.1%}'.format(
+                result['ops'] / baseline[name]['ops'] - 1)
+        else:
+            change = ''
+
+        lines.append(
+            '{:<52} {:>12.0f} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.0f} '
+            '{:>8.2f} {:>8}'.format(
+                name, result['ops'], result['p50'], result['p90'],
+                result['p99'], result['alloc'], result['gc'], change))
+
+    return '\n'.join(lines)
@@ -39,11 +39,18 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.6',
         'Topic :: Database',
         'Framework :: Django',
     ],
     keywords='django generic views',
-    packages=['actionviews'],
+    packages=[
+        'actionviews',
+        'actionviews.management',
+        'actionviews.management.commands',
+    ],
+    python_requires='>=3.5',
     install_requires=['django'],
     tests_require=['pytest'],
     cmdclass = {'test': PyTest},
@@ -0,0 +1,270 @@
+import asyncio
+
+from django.conf.urls import patterns
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import resolve
+import pytest
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+@pytest.fixture
+def django_request(request_factory):
+    return request_factory.get('/')
+
+
+@pytest.fixture
+def urlconf(monkeypatch):
+
+    def set_urlconf(view_class):
+        monkeypatch.setattr(
+            'django.core.urlresolvers.get_urlconf',
+            lambda: type(
+                'urlconf', (), {
+                    'urlpatterns': patterns('', *view_class.urls)}))
+
+    return set_urlconf
+
+
+def test_sync_action_sync_view():
+    from actionviews.base import TemplateView
+
+    class TestView(TemplateView):
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    assert not TestView.action_plans['index'].is_async
+    assert not asyncio.iscoroutinefunction(TestView.urls[0].callback)
+
+
+def test_async_action(urlconf, django_request):
+    from actionviews.base import TemplateView
+
+    class TestTemplateView(TemplateView):
+
+        async def do_index(self:''):
+            await asyncio.sleep(0)
+            return {'result': 'test'}
+
+    urlconf(TestTemplateView)
+
+    view = TestTemplateView.urls[0].callback
+
+    assert TestTemplateView.action_plans['index'].is_async
+    assert asyncio.iscoroutinefunction(view)
+
+    response = run(view(django_request))
+
+    assert response.rendered_content == 'test'
+
+
+def test_async_handler(django_request):
+    from actionviews.base import View
+
+    class TestView(View):
+
+        async def get(self, request):
+            return await self.get_context_data()
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    view = TestView.urls[0].callback
+
+    assert asyncio.iscoroutinefunction(view)
+    assert run(view(django_request)) == {'result': 'test'}
+
+
+def test_async_action_response(django_request):
+    from django.http.response import HttpResponse
+    from actionviews.base import TemplateView
+    from actionviews.exceptions import ActionResponse
+
+    class TestView(TemplateView):
+
+        async def do_index(self:''):
+            raise ActionResponse(HttpResponse(status=201))
+
+        async def do_returned(self):
+            return HttpResponse(status=202)
+
+    urls_data = {url.name: url for url in TestView.urls}
+
+    response = run(urls_data['index'].callback(django_request))
+    assert response.status_code == 201
+
+    response = run(urls_data['returned'].callback(django_request))
+    assert response.status_code == 202
+
+
+@pytest.mark.parametrize('parent_is_async', [True, False])
+def test_async_child(urlconf, request_factory, parent_is_async):
+    from actionviews.base import View, TemplateView
+    from actionviews.decorators import child_view
+
+    class ChildView(TemplateView):
+
+        async def do_index(self):
+            return {}
+
+    class ParentView(View):
+
+        if parent_is_async:
+            @child_view(ChildView)
+            async def do_pindex(self, result='test'):
+                return {'result': result}
+        else:
+            @child_view(ChildView)
+            def do_pindex(self, result='test'):
+                return {'result': result}
+
+    urlconf(ParentView)
+
+    resolver_match = resolve('/pindex/result/test/index/')
+    response = run(resolver_match.func(
+        request_factory.get('/pindex/result/test/index/'),
+        **resolver_match.kwargs))
+
+    assert response.rendered_content == 'test'
+
+
+def test_async_parent_sync_child():
+    from actionviews.base import View, TemplateView
+    from actionviews.decorators import child_view
+
+    class ChildView(TemplateView):
+
+        def do_index(self):
+            return {}
+
+    class ParentView(View):
+
+        @child_view(ChildView)
+        async def do_pindex(self):
+            return {}
+
+    with pytest.raises(ImproperlyConfigured):
+        ParentView.urls
+
+
+def test_async_action_decorator(django_request):
+    from functools import wraps
+    from django.http.response import HttpResponseRedirect
+    from actionviews.base import DummyView
+    from actionviews.decorators import action_decorator
+
+    def pass_through(view_func):
+        return wraps(view_func)(
+            lambda request, *args, **kwargs:
+                view_func(request, *args, **kwargs))
+
+    def redirect(view_func):
+        return wraps(view_func)(
+            lambda request, *args, **kwargs: HttpResponseRedirect('/'))
+
+    class TestView(DummyView):
+
+        @action_decorator(pass_through)
+        async def do_index(self:''):
+            await asyncio.sleep(0)
+            return {'result': 'test'}
+
+        @action_decorator(redirect)
+        async def do_redirect(self):
+            return {}
+
+    assert TestView.action_plans['index'].is_async
+    assert run(TestView.as_view(TestView.do_index)(django_request)) == {
+        'result': 'test'}
+
+    response = run(TestView.as_view(TestView.do_redirect)(django_request))
+
+    assert response.status_code == 302
+
+
+def test_async_form(django_request):
+    from django import forms
+    from actionviews.base import DummyView
+    from actionviews.decorators import form
+
+    class TestForm(forms.Form):
+        field = forms.CharField()
+
+    class TestView(DummyView):
+
+        @form(TestForm)
+        async def do_update(self:''):
+            return {'result': self.form.is_valid()}
+
+    view = TestView.urls[0].callback
+
+    assert asyncio.iscoroutinefunction(view)
+    assert isinstance(run(view(django_request))['form'], TestForm)
+
+
+def test_async_context_loaders(django_request):
+    from actionviews.base import DummyView
+    from actionviews.decorators import loaders
+
+    started = []
+
+    async def load_async(self, pk):
+        started.append('async')
+        await asyncio.sleep(0.01)
+        return 'async {}'.format(pk)
+
+    def load_sync(self, pk):
+        started.append('sync')
+        return 'sync {}'.format(pk)
+
+    class TestView(DummyView):
+
+        @loaders(first=load_async, second=load_sync)
+        async def do_index(self, pk):
+            await asyncio.sleep(0)
+            # loaders are started before the action awaits
+            assert 'async' in started
+            return {'result': 'test'}
+
+    view = TestView.as_view(TestView.do_index)
+
+    assert run(view(django_request, pk='1')) == {
+        'result': 'test', 'first': 'async 1', 'second': 'sync 1'}
+
+
+def test_async_context_loaders_returned_response(django_request):
+    from django.http.response import HttpResponseRedirect
+    from actionviews.base import DummyView
+    from actionviews.decorators import loaders
+
+    cancelled = []
+
+    async def load_failing(self):
+
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+        raise RuntimeError
+
+    class TestView(DummyView):
+
+        @loaders(failing=load_failing)
+        async def do_index(self):
+            await asyncio.sleep(0)
+            return HttpResponseRedirect('/')
+
+    view = TestView.as_view(TestView.do_index)
+    response = run(view(django_request))
+
+    assert response.status_code == 302
+
+    # let the cancelled loader task finish
+    run(asyncio.sleep(0))
+
+    assert cancelled == [True]
@@ -177,9 +177,16 @@ def test_urls_child():
 
     assert (parent_urls[0]._regex ==
         r'^pdetail/(parent_id/(?P<parent_id>[\w\d]+)/)?')
-    assert (
-        parent_urls[0].default_kwargs['parent_action'].__name__ ==
-        'do_pdetail')
+    from actionviews.base import ParentLink
+
+    parent_link, = [value for value in parent_urls[0].default_kwargs.values()
+        if isinstance(value, ParentLink)]
+
+    assert parent_link.name == 'pdetail'
+    assert parent_link.action.__name__ == 'do_pdetail'
+    assert parent_link.param_names == ('parent_id',)
+    assert parent_link.view_class is ParentView
+    assert parent_link.child_view is ChildView
 
     child_urls = parent_urls[0].url_patterns
     child_urls_data = {url.name: url for url in child_urls}
@@ -222,3 +229,58 @@ def test_resolve_child(monkeypatch):
 
     assert resolve('/plist/').func.__name__ == 'do_plist'    
     assert resolve('/pdetail/parent_id/1/clist/').func.__name__ == 'do_clist'
+
+
+def test_urls_lazy(monkeypatch):
+    from actionviews import base
+    from actionviews.base import ActionViewMeta, View
+
+    built_plans = []
+    build_action_plan = base.build_action_plan
+
+    def counting_build_action_plan(view_class, action_name, action_method):
+        built_plans.append((view_class, action_name))
+        return build_action_plan(view_class, action_name, action_method)
+
+    monkeypatch.setattr(base, 'build_action_plan', counting_build_action_plan)
+
+    class ParentView(View):
+
+        def do_index(self:''):
+            pass
+
+    class ChildView(ParentView):
+
+        def do_detail(self, pk):
+            pass
+
+    assert built_plans == []
+    assert not ActionViewMeta.urls.is_cached(ParentView)
+
+    parent_urls = ParentView.urls
+
+    assert ParentView.urls is parent_urls
+    assert built_plans == [(ParentView, 'index')]
+    assert not ActionViewMeta.urls.is_cached(ChildView)
+    assert {url.name for url in ChildView.urls} == {'index', 'detail'}
+    assert {url.name for url in ParentView.urls} == {'index'}
+
+
+def test_urls_warm_up():
+    from actionviews.base import ActionViewMeta, View
+
+    class ParentView(View):
+
+        def do_index(self:''):
+            pass
+
+    class ChildView(ParentView):
+
+        def do_detail(self, pk):
+            pass
+
+    ParentView.warm_up()
+
+    assert ActionViewMeta.urls.is_cached(ParentView)
+    assert ActionViewMeta.urls.is_cached(ChildView)
+    assert ActionViewMeta.action_plans.is_cached(ChildView)
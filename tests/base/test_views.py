@@ -267,3 +267,674 @@ def test_return_response_from_action(django_request, monkeypatch):
     response = view(django_request)
 
     assert response.status_code == 200
+
+
+def test_action_plans():
+    from actionviews.base import TemplateView
+
+    class TestView(TemplateView):
+
+        def do_index(self:'', skip:r'\d+'=0):
+            return {}
+
+        @require_method('post')
+        def do_update(self, pk):
+            return {}
+
+    index_plan = TestView.action_plans['index']
+    update_plan = TestView.action_plans['update']
+
+    assert index_plan.name == 'index'
+    assert index_plan.action is TestView.do_index
+    assert index_plan.prefix == ''
+    assert index_plan.param_names == ('skip',)
+    assert index_plan.defaults == {'skip': 0}
+    assert index_plan.allowed_methods == ('get', 'post', 'head', 'options')
+    assert index_plan.handlers == {
+        'GET': TestView.get,
+        'POST': TestView.post,
+        'HEAD': TestView.head,
+        'OPTIONS': TestView.options,
+    }
+
+    assert update_plan.prefix == 'update'
+    assert update_plan.param_names == ('pk',)
+    assert update_plan.allowed_methods == ('post',)
+    assert update_plan.handlers == {'POST': TestView.post}
+
+    with pytest.raises(TypeError):
+        index_plan.handlers['PUT'] = TestView.get
+
+
+def test_view_uses_plan(TestView, django_request):
+
+    class TestGetView(TestView):
+
+        def get(self, request):
+            assert self.plan is TestGetView.action_plans['index']
+            assert self.action.name == 'index'
+            return self.action()
+
+    view = TestGetView.urls[0].callback
+    assert view(django_request) == {'result': 'test'}
+
+
+def test_template_name_namespace_from_resolver_match(TestView, django_request):
+    from django.core.urlresolvers import ResolverMatch
+
+    class TestGetView(TestView, TemplateResponseMixin):
+
+        def get(self, request):
+            return self.get_template_names()
+
+    django_request.resolver_match = ResolverMatch(
+        TestGetView.urls[0].callback, (), {}, namespaces=['app'])
+
+    view = TestGetView.urls[0].callback
+
+    assert view(django_request) == ['app/TestGetView/index.html']
+
+
+def test_template_names_cached(TestView, django_request):
+    from actionviews.base import format_template_names
+
+    class TestGetView(TestView, TemplateResponseMixin):
+
+        def get(self, request):
+            return self.get_template_names()
+
+    view = TestGetView.urls[0].callback
+    format_template_names.cache_clear()
+
+    first = view(django_request)
+    first.append('mutated.html')
+
+    assert view(django_request) == ['TestGetView/index.html']
+    assert format_template_names.cache_info().hits == 1
+
+
+def test_child_chain(monkeypatch, request_factory):
+    from actionviews.base import View, DummyView
+    from actionviews.decorators import child_view
+
+    calls = []
+
+    class ItemView(DummyView):
+
+        def do_detail(self, item):
+            calls.append('item')
+            return {'item': item, 'ancestors': list(self.parents)}
+
+    class ProjectView(View):
+
+        @child_view(ItemView)
+        def do_project(self, project):
+            calls.append('project')
+            return {'project': project, 'org_seen': 'org' in self.parents}
+
+    class OrgView(View):
+
+        @child_view(ProjectView)
+        def do_org(self, org):
+            calls.append('org')
+            return {'org': org}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *OrgView.urls)}))
+
+    path = '/org/org/1/project/project/2/detail/item/3/'
+    resolver_match = resolve(path)
+    request = request_factory.get(path)
+
+    context = resolver_match.func(request, **resolver_match.kwargs)
+
+    assert calls == ['org', 'project', 'item']
+    assert context['org'] == '1'
+    assert context['project'] == '2'
+    assert context['org_seen']
+    assert context['item'] == '3'
+    assert context['ancestors'] == ['org', 'project']
+    assert list(context['parents'].items()) == [
+        ('org', {'org': '1'}),
+        ('project', {'project': '2', 'org_seen': True}),
+    ]
+
+    # ancestors are evaluated once per request
+    resolver_match.func(request, **resolver_match.kwargs)
+
+    assert calls == ['org', 'project', 'item', 'item']
+
+
+def test_streaming_template_view(django_request, monkeypatch):
+    from django.http.response import StreamingHttpResponse
+    from actionviews.base import StreamingTemplateView
+
+    produced = []
+
+    class TestStreamingView(StreamingTemplateView):
+
+        def do_index(self:''):
+            self.context['title'] = 'item'
+
+            for name in ['a', 'b']:
+                produced.append(name)
+                yield {'name': name}
+
+        def do_plain(self):
+            return iter([1, 2])
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestStreamingView.urls)}))
+
+    urls_data = {url.name: url for url in TestStreamingView.urls}
+    response = urls_data['index'].callback(django_request)
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert produced == []
+
+    content = b''.join(response.streaming_content)
+
+    assert content == b'<ul><li>item: a</li><li>item: b</li></ul>'
+
+    response = urls_data['plain'].callback(django_request)
+
+    assert b''.join(response.streaming_content) == b'1;2;'
+
+
+def test_streaming_template_view_dict_action(django_request, monkeypatch):
+    from actionviews.base import StreamingTemplateView
+
+    class TestTemplateView(StreamingTemplateView):
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    response = TestTemplateView.urls[0].callback(django_request)
+
+    assert response.rendered_content == 'test'
+
+
+def test_json_view(django_request):
+    import datetime
+    import json
+    from actionviews.base import JSONView
+
+    class TestJSONView(JSONView):
+
+        def do_index(self:''):
+            return {'result': 'test', 'date': datetime.date(2014, 3, 1)}
+
+    response = TestJSONView.urls[0].callback(django_request)
+
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content.decode()) == {
+        'result': 'test', 'date': '2014-03-01'}
+
+
+def test_json_view_encoder(django_request):
+    from actionviews.base import JSONView
+
+    class TestJSONView(JSONView):
+        json_dumps = staticmethod(lambda data: repr(sorted(data)))
+
+        def do_index(self:''):
+            return {'b': 1, 'a': 2}
+
+    response = TestJSONView.urls[0].callback(django_request)
+
+    assert response.content == b"['a', 'b']"
+
+
+def test_json_view_stream(django_request):
+    import json
+    from django.http.response import StreamingHttpResponse
+    from actionviews.base import JSONView
+
+    class TestJSONView(JSONView):
+
+        def do_index(self:''):
+            for index in range(3):
+                yield {'index': index}
+
+        def do_empty(self):
+            return iter([])
+
+    urls_data = {url.name: url for url in TestJSONView.urls}
+    response = urls_data['index'].callback(django_request)
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(b''.join(response.streaming_content).decode()) == [
+        {'index': 0}, {'index': 1}, {'index': 2}]
+
+    response = urls_data['empty'].callback(django_request)
+
+    assert b''.join(response.streaming_content) == b'[]'
+
+
+def test_negotiated_view(request_factory, monkeypatch):
+    import json
+    from actionviews.base import NegotiatedView
+    from actionviews.decorators import render_with
+    from actionviews.renderers import JSONRenderer
+
+    class TestTemplateView(NegotiatedView):
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+        @render_with(JSONRenderer())
+        def do_data(self):
+            return {'result': 'data'}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    urls_data = {url.name: url for url in TestTemplateView.urls}
+    index = urls_data['index'].callback
+
+    response = index(request_factory.get('/'))
+
+    assert response.rendered_content == 'test'
+    assert response['Vary'] == 'Accept'
+
+    response = index(request_factory.get(
+        '/', HTTP_ACCEPT='text/html;q=0.5, application/json'))
+
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content.decode()) == {'result': 'test'}
+
+    response = index(request_factory.get('/', {'format': 'json'}))
+
+    assert response['Content-Type'] == 'application/json'
+
+    response = index(request_factory.get('/', HTTP_ACCEPT='image/png'))
+
+    assert response.status_code == 406
+
+    # action renderers are precomputed in the plan
+    plan = TestTemplateView.action_plans['data']
+
+    assert [renderer.format for renderer in plan.negotiation.renderers] == [
+        'json']
+
+    response = urls_data['data'].callback(
+        request_factory.get('/data/', HTTP_ACCEPT='*/*'))
+
+    assert json.loads(response.content.decode()) == {'result': 'data'}
+
+    response = urls_data['data'].callback(
+        request_factory.get('/data/', {'format': 'html'}))
+
+    assert response.status_code == 406
+
+
+def test_compact_instances(django_request, monkeypatch):
+    from actionviews.base import StreamingTemplateView
+
+    instances = []
+
+    class TestStreamingView(StreamingTemplateView):
+        compact_instances = True
+
+        def do_index(self:''):
+            instances.append(self)
+            self.context['title'] = 'item'
+            yield {'name': 'a'}
+
+    class TestTemplateView(TestStreamingView):
+        instance_slots = ('extra',)
+
+        def do_index(self:''):
+            instances.append(self)
+            self.extra = 'test'
+            return {'result': self.extra}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestStreamingView.urls)}))
+
+    response = TestStreamingView.urls[0].callback(django_request)
+
+    assert b''.join(response.streaming_content) == b'<ul><li>item: a</li></ul>'
+
+    response = TestTemplateView.urls[0].callback(django_request)
+
+    assert response.rendered_content == 'test'
+    assert TestTemplateView.__slots__ == ('extra',)
+
+    for instance in instances:
+        assert not hasattr(instance, '__dict__')
+
+    with pytest.raises(AttributeError):
+        instances[0].extra = 'test'
+
+
+def test_fast_options_and_not_allowed(request_factory):
+    from django.http.response import HttpResponse
+    from actionviews.base import View
+
+    instances = []
+
+    class TestView(View):
+
+        def __init__(self):
+            instances.append(self)
+
+        def get(self, request, *args, **kwargs):
+            return HttpResponse()
+
+        @require_method(['GET', 'options'])
+        def do_index(self:''):
+            return {}
+
+    class TestCustomView(TestView):
+
+        def http_method_not_allowed(self, request, *args, **kwargs):
+            return HttpResponse(status=418)
+
+    plan = TestView.action_plans['index']
+
+    assert plan.allow == 'GET, OPTIONS'
+
+    view = TestView.urls[0].callback
+    response = view(request_factory.options('/'))
+
+    assert response['Allow'] == 'GET, OPTIONS'
+
+    response = view(request_factory.post('/'))
+
+    assert response.status_code == 405
+    assert response['Allow'] == 'GET, OPTIONS'
+    assert instances == []
+
+    view(request_factory.get('/'))
+
+    assert len(instances) == 1
+
+    response = TestCustomView.urls[0].callback(request_factory.post('/'))
+
+    assert response.status_code == 418
+    assert len(instances) == 2
+
+
+def test_head_skips_rendering(request_factory):
+    from actionviews.base import JSONView, NegotiatedView, TemplateView
+
+    calls = []
+
+    class TestHeadView(TemplateView):
+        # rendering would fail with the missing template
+        template_name = 'missing.html'
+
+        def do_index(self:''):
+            calls.append('index')
+            return {'result': 'test'}
+
+    class TestJSONView(JSONView):
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    class TestNegotiatedView(NegotiatedView):
+        template_name = 'missing.html'
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    response = TestHeadView.urls[0].callback(request_factory.head('/'))
+
+    assert response.status_code == 200
+    assert response.content == b''
+    assert response['Content-Type'] == 'text/html; charset=utf-8'
+    assert calls == ['index']
+
+    response = TestJSONView.urls[0].callback(request_factory.head('/'))
+
+    assert response.content == b''
+    assert response['Content-Type'] == 'application/json'
+
+    response = TestNegotiatedView.urls[0].callback(
+        request_factory.head('/', HTTP_ACCEPT='application/json'))
+
+    assert response['Content-Type'] == 'application/json'
+    assert response['Vary'] == 'Accept'
+
+
+def test_context_loaders(django_request):
+    from threading import Barrier
+    from actionviews.base import DummyView
+    from actionviews.decorators import loaders
+
+    # loaders and the action wait for each other so they must run
+    # concurrently
+    barrier = Barrier(3, timeout=5)
+
+    def load_weather(self, pk):
+        barrier.wait()
+        return 'sunny {}'.format(pk)
+
+    def load_stats(self, pk):
+        barrier.wait()
+        return {'pk': pk}
+
+    class TestView(DummyView):
+
+        @loaders(weather=load_weather, stats=load_stats)
+        def do_index(self, pk):
+            barrier.wait()
+            return {'result': 'test', 'weather': 'action wins'}
+
+    plan = TestView.action_plans['index']
+
+    assert [name for name, loader in plan.loaders] == ['weather', 'stats']
+
+    view = TestView.as_view(TestView.do_index)
+
+    assert view(django_request, pk='1') == {
+        'result': 'test', 'weather': 'action wins', 'stats': {'pk': '1'}}
+
+
+def test_typed_params(monkeypatch, request_factory):
+    import datetime
+    import uuid
+    from django.core.urlresolvers import Resolver404
+    from actionviews.base import DummyView, View
+    from actionviews.converters import slug
+    from actionviews.decorators import child_view
+
+    class ChildView(DummyView):
+
+        def do_index(self:'', day:datetime.date):
+            return {'day': day}
+
+    class ParentView(DummyView):
+
+        @child_view(ChildView)
+        def do_index(self:'', pk:int):
+            return {'pk': pk}
+
+        def do_detail(self, key:uuid.UUID, name:slug):
+            return {'key': key, 'name': name}
+
+    assert ParentView.get_url_regex(ParentView.action_plans['detail']) == (
+        r'^detail/key/(?P<key>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-'
+        r'[0-9a-f]{4}-[0-9a-f]{12})/name/(?P<name>[-a-zA-Z0-9_]+)/')
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *ParentView.urls)}))
+
+    key = uuid.uuid4()
+    resolver_match = resolve('/detail/key/{}/name/a-b/'.format(key))
+
+    assert resolver_match.kwargs == {'key': key, 'name': 'a-b'}
+
+    path = '/pk/5/day/2016-02-29/'
+    resolver_match = resolve(path)
+    result = resolver_match.func(
+        request_factory.get(path), **resolver_match.kwargs)
+
+    assert result['pk'] == 5
+    assert result['day'] == datetime.date(2016, 2, 29)
+
+    # malformed value doesn't match
+    with pytest.raises(Resolver404):
+        resolve('/pk/5/day/2015-02-29/')
+
+    with pytest.raises(Resolver404):
+        resolve('/detail/key/{}/name/a-b/'.format('0' * 36))
+
+    with pytest.raises(ImproperlyConfigured):
+
+        class BadView(View):
+
+            def do_index(self, pk:object()):
+                return {}
+
+        BadView.urls
+
+
+def test_child_chain_same_action_names(monkeypatch, request_factory):
+    from actionviews.base import View, DummyView
+    from actionviews.decorators import child_view
+
+    class ItemView(DummyView):
+
+        def do_detail(self, item):
+            return {'item': item}
+
+    class ProjectView(View):
+
+        @child_view(ItemView)
+        def do_detail(self, project):
+            return {'project': project}
+
+    class OrgView(View):
+
+        @child_view(ProjectView)
+        def do_detail(self, org):
+            return {'org': org}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *OrgView.urls)}))
+
+    path = '/detail/org/1/detail/project/2/detail/item/3/'
+    resolver_match = resolve(path)
+    context = resolver_match.func(
+        request_factory.get(path), **resolver_match.kwargs)
+
+    assert context['org'] == '1'
+    assert context['project'] == '2'
+    assert context['item'] == '3'
+    assert list(context['parents'].items()) == [
+        ('OrgView.detail', {'org': '1'}),
+        ('ProjectView.detail', {'project': '2'}),
+    ]
+
+
+def test_context_loaders_cleanup(django_request, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Event
+    from actionviews.base import DummyView
+    from actionviews.decorators import loaders
+
+    closed = []
+    monkeypatch.setattr(
+        'actionviews.base.close_old_connections', lambda: closed.append(1))
+
+    started = Event()
+    release = Event()
+    calls = []
+
+    def load_slow(self):
+        started.set()
+        release.wait(5)
+        calls.append('slow')
+
+    def load_pending(self):
+        calls.append('pending')
+
+    class TestView(DummyView):
+        # single thread so the second loader waits for the first one
+        loader_executor = ThreadPoolExecutor(1)
+
+        @loaders(slow=load_slow, pending=load_pending)
+        def do_index(self):
+            started.wait(5)
+            raise ValueError
+
+        @loaders(slow=lambda self: 'done')
+        def do_detail(self):
+            return {}
+
+    view = TestView.as_view(TestView.do_index)
+
+    with pytest.raises(ValueError):
+        view(django_request)
+
+    release.set()
+    TestView.loader_executor.shutdown()
+
+    # the pending loader is cancelled and connections are closed after the
+    # running one
+    assert calls == ['slow']
+    assert closed == [1]
+
+    TestView.loader_executor = ThreadPoolExecutor(1)
+    view = TestView.as_view(TestView.do_detail)
+
+    assert view(django_request) == {'slow': 'done'}
+    assert closed == [1, 1]
+
+
+def test_context_loaders_returned_response(django_request):
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Event
+    from django.http.response import HttpResponseRedirect
+    from actionviews.base import DummyView
+    from actionviews.decorators import loaders
+
+    release = Event()
+
+    def load_failing(self):
+        release.wait(5)
+        raise RuntimeError
+
+    class TestView(DummyView):
+        loader_executor = ThreadPoolExecutor(1)
+
+        @loaders(failing=load_failing)
+        def do_index(self):
+            return HttpResponseRedirect('/')
+
+    view = TestView.as_view(TestView.do_index)
+
+    # the response is returned while the loader still runs
+    response = view(django_request)
+    release.set()
+    TestView.loader_executor.shutdown()
+
+    assert response.status_code == 302
@@ -11,8 +11,15 @@ sys.path[0:0] = ['']
 @pytest.fixture(scope='session', autouse=True)
 def django_settings():
     settings.configure(
-        DATABASES={'default': {'ENGINE': 'django.db.backends.dummy'}},
+        DATABASES={
+            'default': {'ENGINE': 'django.db.backends.dummy'},
+            'sqlite': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            },
+        },
         TEMPLATE_DIRS=(path.join(path.dirname(__file__), 'templates'),),
+        INSTALLED_APPS=['actionviews'],
     )
 
 
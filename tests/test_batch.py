@@ -0,0 +1,187 @@
+import json
+
+from django.conf.urls import include, patterns, url
+from django.core.urlresolvers import resolve
+from django.http import Http404
+from django.http.response import HttpResponseRedirect
+import pytest
+
+from actionviews.batch import get_batch_items
+
+
+@pytest.fixture
+def BatchView(monkeypatch):
+    from actionviews.base import TemplateView
+    from actionviews.decorators import child_view
+
+    calls = []
+
+    class ChildView(TemplateView):
+
+        def do_item(self, item_pk):
+            calls.append('item')
+            return {'item': item_pk, 'parent': self.parents['list']['pk']}
+
+    class BatchView(TemplateView):
+        batch_url = r'batch/'
+        batch_max_size = 3
+        calls = []
+
+        def do_detail(self, pk):
+            calls.append('detail')
+
+            if pk == '0':
+                raise Http404
+
+            return {'pk': pk, 'q': self.request.GET.get('q')}
+
+        def do_redirect(self):
+            return HttpResponseRedirect('/')
+
+        @child_view(ChildView)
+        def do_list(self, pk):
+            calls.append('list')
+            return {'pk': pk}
+
+    BatchView.calls = calls
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns(
+                    '', url(r'^views/', include(BatchView.urls)))}))
+
+    return BatchView
+
+
+def get_results(request):
+    resolver_match = resolve(request.path)
+    response = resolver_match.func(request, **resolver_match.kwargs)
+
+    if response.status_code != 200:
+        return response.status_code, None
+
+    return response.status_code, json.loads(response.content.decode())
+
+
+def test_batch_get(BatchView, request_factory):
+    status_code, results = get_results(request_factory.get(
+        '/views/batch/', {'path': ['detail/pk/1/', 'missing/']}))
+
+    assert status_code == 200
+    assert results == [
+        {'path': 'detail/pk/1/', 'status': 200,
+            'data': {'pk': '1', 'q': None}},
+        {'path': 'missing/', 'status': 404, 'data': None},
+    ]
+
+
+def test_batch_post(BatchView, request_factory):
+    request = request_factory.post(
+        '/views/batch/',
+        json.dumps([
+            {'path': 'list/pk/1/item/item_pk/1/'},
+            {'path': 'list/pk/1/item/item_pk/2/', 'params': {'q': 'x'}},
+            'redirect/',
+        ]),
+        content_type='application/json')
+    status_code, results = get_results(request)
+
+    assert [result['status'] for result in results] == [200, 200, 302]
+    assert results[1]['data'] == {'item': '2', 'parent': '1', 'pk': '1'}
+
+    # parent action is evaluated once for the batch
+    assert BatchView.calls == ['list', 'item', 'item']
+
+
+def test_batch_params_and_errors(BatchView, request_factory):
+    status_code, results = get_results(request_factory.post(
+        '/views/batch/',
+        json.dumps([
+            {'path': '/detail/pk/1/', 'params': {'q': 'x'}},
+            'detail/pk/0/',
+        ]),
+        content_type='application/json'))
+
+    assert results[0]['data'] == {'pk': '1', 'q': 'x'}
+    assert results[1]['status'] == 404
+
+    status_code, results = get_results(request_factory.get(
+        '/views/batch/', {'path': ['detail/pk/1/'] * 4}))
+
+    assert status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    '{"path": "detail/pk/1/"}',
+    '[{"params": {}}]',
+    '[1]',
+    'garbage',
+])
+def test_get_batch_items_malformed(body, request_factory):
+    request = request_factory.post(
+        '/batch/', body, content_type='application/json')
+
+    with pytest.raises(ValueError):
+        get_batch_items(request)
+
+
+def test_batch_applies_dispatch_checks(monkeypatch, request_factory):
+    from django.core.exceptions import PermissionDenied
+    from actionviews.base import JSONView
+
+    class SecretView(JSONView):
+        batch_url = r'batch/'
+
+        def dispatch(self, request, *args, **kwargs):
+
+            if self.plan.name == 'secret':
+                raise PermissionDenied
+
+            return super(SecretView, self).dispatch(request, *args, **kwargs)
+
+        def do_secret(self):
+            return {'secret': 42}
+
+        def do_public(self):
+            return {'public': 1}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {'urlpatterns': patterns('', *SecretView.urls)}))
+
+    status_code, results = get_results(request_factory.get(
+        '/batch/', {'path': ['secret/', 'public/']}))
+
+    assert results == [
+        {'path': 'secret/', 'status': 403, 'data': None},
+        {'path': 'public/', 'status': 200, 'data': {'public': 1}},
+    ]
+
+
+def test_batch_unserializable_item(monkeypatch, request_factory):
+    from actionviews.base import TemplateView
+
+    class TestView(TemplateView):
+        batch_url = r'batch/'
+
+        def do_form(self):
+            return {'form': object()}
+
+        def do_public(self):
+            return {'public': 1}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {'urlpatterns': patterns('', *TestView.urls)}))
+
+    status_code, results = get_results(request_factory.get(
+        '/batch/', {'path': ['form/', 'public/']}))
+
+    assert status_code == 200
+    assert results == [
+        {'path': 'form/', 'status': 500, 'data': None},
+        {'path': 'public/', 'status': 200, 'data': {'public': 1}},
+    ]
@@ -0,0 +1,230 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+
+
+@pytest.fixture
+def TestView():
+    from actionviews.base import DummyView
+    from actionviews.decorators import cache_action
+
+    class TestView(DummyView):
+        calls = []
+
+        @cache_action()
+        def do_detail(self, pk):
+            self.calls.append(pk)
+            return {'pk': pk}
+
+        @cache_action(vary_on=[lambda view: view.request.GET.get('lang')])
+        def do_translated(self, pk):
+            self.calls.append(pk)
+            return {'pk': pk, 'lang': self.request.GET.get('lang')}
+
+    return TestView
+
+
+def call(view_class, action_name, request, **kwargs):
+    urls_data = {url.name: url for url in view_class.urls}
+    return urls_data[action_name].callback(request, **kwargs)
+
+
+def test_cache_action(TestView, request_factory):
+    request = request_factory.get('/')
+
+    assert call(TestView, 'detail', request, pk='1') == {'pk': '1'}
+    assert call(TestView, 'detail', request, pk='1') == {'pk': '1'}
+    assert call(TestView, 'detail', request, pk='2') == {'pk': '2'}
+    assert TestView.calls == ['1', '2']
+
+
+def test_cache_action_per_view_class(TestView, request_factory):
+
+    class ChildView(TestView):
+        pass
+
+    request = request_factory.get('/')
+
+    call(TestView, 'detail', request, pk='1')
+    call(ChildView, 'detail', request, pk='1')
+
+    assert TestView.calls == ['1', '1']
+
+
+def test_invalidate_action(TestView, request_factory):
+    from actionviews.cache import invalidate_action
+
+    request = request_factory.get('/')
+
+    call(TestView, 'detail', request, pk='1')
+    call(TestView, 'detail', request, pk='2')
+    invalidate_action(TestView, 'detail', pk=1)
+    call(TestView, 'detail', request, pk='1')
+    call(TestView, 'detail', request, pk='2')
+
+    assert TestView.calls == ['1', '2', '1']
+
+
+def test_cache_action_vary_on(TestView, request_factory):
+    from actionviews.cache import invalidate_action
+
+    en = request_factory.get('/', {'lang': 'en'})
+    de = request_factory.get('/', {'lang': 'de'})
+
+    assert call(TestView, 'translated', en, pk='1')['lang'] == 'en'
+    assert call(TestView, 'translated', de, pk='1')['lang'] == 'de'
+    assert call(TestView, 'translated', en, pk='1')['lang'] == 'en'
+    assert TestView.calls == ['1', '1']
+
+    invalidate_action(TestView, 'translated', pk='1')
+    call(TestView, 'translated', en, pk='1')
+    call(TestView, 'translated', de, pk='1')
+
+    assert TestView.calls == ['1', '1', '1', '1']
+
+
+def test_cache_action_skips_responses(request_factory):
+    from django.http.response import HttpResponse
+    from actionviews.base import DummyView
+    from actionviews.decorators import cache_action
+
+    calls = []
+
+    class TestView(DummyView):
+
+        @cache_action()
+        def do_index(self:''):
+            calls.append(None)
+            return HttpResponse()
+
+    request = request_factory.get('/')
+
+    TestView.urls[0].callback(request)
+    TestView.urls[0].callback(request)
+
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def RenderView(monkeypatch):
+    from django.conf.urls import patterns
+    from actionviews.base import TemplateView
+    from actionviews.decorators import cache_render
+
+    class TestTemplateView(TemplateView):
+        calls = []
+
+        @cache_render(
+            vary_on=[lambda view: view.request.GET.get('lang')],
+            lock_wait=1)
+        def do_index(self, pk):
+            self.calls.append(pk)
+            return {'result': '{}:{}'.format(pk, len(self.calls))}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    return TestTemplateView
+
+
+def test_cache_render(RenderView, request_factory):
+    from actionviews.cache import invalidate_action
+
+    def get_content(pk, **params):
+        response = call(
+            RenderView,
+            'index',
+            request_factory.get('/index/pk/{}/'.format(pk), params),
+            pk=pk)
+        return response.content
+
+    assert get_content('1') == b'1:1'
+    assert get_content('1') == b'1:1'
+    assert get_content('2') == b'2:2'
+    assert get_content('1', lang='en') == b'1:3'
+    assert RenderView.calls == ['1', '2', '1']
+
+    invalidate_action(RenderView, 'index', pk='1')
+
+    assert get_content('1') == b'1:4'
+    assert get_content('1', lang='en') == b'1:5'
+    assert get_content('2') == b'2:2'
+
+
+def test_cache_render_stampede(RenderView, request_factory):
+    from threading import Timer
+
+    request = request_factory.get('/index/pk/1/')
+    render_cache = RenderView.action_plans['index'].render_cache
+    view = RenderView()
+    view.request = request
+    key, result = render_cache.get(view, 'index', {'pk': '1'})
+
+    # another worker holds the lock and renders the entry meanwhile
+    assert render_cache.acquire(key)
+
+    Timer(0.1, render_cache.cache.set, [key, {
+        'content': b'rendered', 'content_type': 'text/html'}]).start()
+
+    response = call(RenderView, 'index', request, pk='1')
+
+    assert response.content == b'rendered'
+    assert RenderView.calls == []
+
+    # the lock holder failed so the waiting request renders
+    render_cache.cache.delete(key)
+    Timer(0.1, render_cache.release, [key]).start()
+
+    response = call(RenderView, 'index', request, pk='1')
+
+    assert response.content == b'1:1'
+
+
+def test_cache_render_negotiated(monkeypatch, request_factory):
+    from django.conf.urls import patterns
+    from actionviews.base import NegotiatedView
+    from actionviews.decorators import cache_render
+
+    # reuses the template of TestTemplateView
+    class TestTemplateView(NegotiatedView):
+        calls = []
+
+        @cache_render()
+        def do_index(self, pk):
+            self.calls.append(pk)
+            return {'result': pk}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    def get(accept):
+        return call(
+            TestTemplateView,
+            'index',
+            request_factory.get('/index/pk/1/', HTTP_ACCEPT=accept),
+            pk='1')
+
+    for _ in range(2):
+        response = get('text/html')
+
+        assert response['Content-Type'].startswith('text/html')
+        assert response['Vary'] == 'Accept'
+        assert response.content == b'1'
+
+        response = get('application/json')
+
+        assert response['Content-Type'] == 'application/json'
+        assert response['Vary'] == 'Accept'
+        assert response.content == b'{"result":"1"}'
+
+    assert TestTemplateView.calls == ['1', '1']
@@ -1,5 +1,7 @@
 from django.conf.urls import patterns
 from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import resolve
+from django.http.response import HttpResponse
 import pytest
 
 
@@ -7,8 +9,10 @@ def test_action_decorator():
     from actionviews.decorators import action_decorator
 
     decorator_request = []
+    decorator_calls = []
 
     def view_decorator(func):
+        decorator_calls.append(func)
 
         def wrapper(request, *args, **kwargs):
             decorator_request.append(request)
@@ -30,9 +34,13 @@ def test_action_decorator():
     view = View()
 
     assert view.method() == 'Request'
-    assert decorator_request == ['Request']
+    assert View().method() == 'Request'
+    assert decorator_request == ['Request', 'Request']
     assert view.method.is_decorated
 
+    # view decorator is applied once
+    assert len(decorator_calls) == 1
+
 
 @pytest.mark.parametrize('decorator_arg,allowed_methods', [
     ('post', ['post']),
@@ -112,3 +120,136 @@ def test_form_decorator(request_factory, monkeypatch):
     view = TestView.urls[0].callback
     response = view(request_factory.post('/', data={'field': 'value'}))
     assert response['result']
+
+
+@pytest.fixture
+def ConditionalView():
+    from datetime import datetime
+    from actionviews.base import TemplateView
+    from actionviews.decorators import child_view, condition, etag
+
+    shared_calls = []
+
+    class ChildView(TemplateView):
+        calls = shared_calls
+
+        @etag(lambda self, parent_id, child_id: '{}-{}'.format(
+            parent_id, child_id))
+        def do_cdetail(self, child_id):
+            self.calls.append('child')
+            return {'result': 'test'}
+
+    class ConditionalView(TemplateView):
+        calls = shared_calls
+
+        @condition(
+            etag_func=lambda self, pk: 'v{}'.format(pk),
+            last_modified_func=lambda self, pk: datetime(2014, 3, 1))
+        def do_detail(self, pk):
+            self.calls.append('detail')
+            return HttpResponse()
+
+        @child_view(ChildView)
+        def do_pdetail(self, parent_id):
+            self.calls.append('parent')
+            return {}
+
+    return ConditionalView
+
+
+def test_condition_decorator():
+    from actionviews.decorators import condition, etag, last_modified
+
+    def etag_func(self):
+        pass
+
+    def last_modified_func(self):
+        pass
+
+    @condition(etag_func, last_modified_func)
+    def action(self):
+        pass
+
+    assert action.etag_func is etag_func
+    assert action.last_modified_func is last_modified_func
+    assert etag(etag_func)(lambda self: None).last_modified_func is None
+    assert last_modified(last_modified_func)(
+        lambda self: None).etag_func is None
+
+
+def test_condition_etag(ConditionalView, request_factory):
+    view = ConditionalView.as_view(ConditionalView.do_detail)
+
+    response = view(request_factory.get('/'), pk='1')
+
+    assert response.status_code == 200
+    assert response['ETag'] == '"v1"'
+    assert response['Last-Modified'] == 'Sat, 01 Mar 2014 00:00:00 GMT'
+
+    response = view(
+        request_factory.get('/', HTTP_IF_NONE_MATCH='"v1"'), pk='1')
+
+    assert response.status_code == 304
+    assert response['ETag'] == '"v1"'
+    assert ConditionalView.calls == ['detail']
+
+    response = view(
+        request_factory.get('/', HTTP_IF_NONE_MATCH='"v1"'), pk='2')
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('if_modified_since,status_code', [
+    ('Sat, 01 Mar 2014 00:00:00 GMT', 304),
+    ('Sun, 02 Mar 2014 00:00:00 GMT', 304),
+    ('Fri, 28 Feb 2014 00:00:00 GMT', 200),
+    ('garbage', 200),
+])
+def test_condition_last_modified(
+        ConditionalView, request_factory, if_modified_since, status_code):
+    view = ConditionalView.as_view(ConditionalView.do_detail)
+    request = request_factory.get(
+        '/', HTTP_IF_MODIFIED_SINCE=if_modified_since)
+
+    assert view(request, pk='1').status_code == status_code
+
+
+def test_condition_child(ConditionalView, request_factory, monkeypatch):
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *ConditionalView.urls)}))
+
+    path = '/pdetail/parent_id/1/cdetail/child_id/2/'
+    resolver_match = resolve(path)
+    request = request_factory.get(path, HTTP_IF_NONE_MATCH='"1-2"')
+    response = resolver_match.func(request, **resolver_match.kwargs)
+
+    assert response.status_code == 304
+    assert ConditionalView.calls == []
+
+
+def test_head_handler(request_factory):
+    from actionviews.base import TemplateView
+    from actionviews.decorators import etag, head_handler
+
+    calls = []
+
+    class HeadView(TemplateView):
+
+        @head_handler(lambda self, pk: {'X-Item': pk})
+        @etag(lambda self, pk: 'v{}'.format(pk))
+        def do_detail(self, pk):
+            calls.append('detail')
+            return {}
+
+    view = HeadView.as_view(HeadView.do_detail)
+    response = view(request_factory.head('/'), pk='1')
+
+    assert response.status_code == 200
+    assert response.content == b''
+    assert response['X-Item'] == '1'
+    assert response['ETag'] == '"v1"'
+    assert response['Content-Type'] == 'text/html; charset=utf-8'
+    assert calls == []
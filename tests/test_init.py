@@ -12,6 +12,28 @@ def test_import_template_view():
     assert TemplateView is base_TemplateView
 
 
+def test_import_streaming_template_view():
+    from actionviews import StreamingTemplateView
+    from actionviews.base import (
+        StreamingTemplateView as base_StreamingTemplateView)
+
+    assert StreamingTemplateView is base_StreamingTemplateView
+
+
+def test_import_json_view():
+    from actionviews import JSONView
+    from actionviews.base import JSONView as base_JSONView
+
+    assert JSONView is base_JSONView
+
+
+def test_import_negotiated_view():
+    from actionviews import NegotiatedView
+    from actionviews.base import NegotiatedView as base_NegotiatedView
+
+    assert NegotiatedView is base_NegotiatedView
+
+
 def test_import_action_response():
     from actionviews import ActionResponse
     from actionviews.exceptions import (
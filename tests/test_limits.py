@@ -0,0 +1,175 @@
+from threading import Timer
+
+from django.http.response import HttpResponse
+
+from actionviews import limits
+from actionviews.limits import ActionLimiter
+
+
+def test_limiter():
+    limiter = ActionLimiter(1)
+
+    assert limiter.acquire()
+    assert not limiter.acquire()
+
+    response = limiter.reject()
+
+    assert response.status_code == 503
+    assert response['Retry-After'] == '1'
+
+    limiter.release()
+
+    assert limiter.stats() == {
+        'max_concurrency': 1,
+        'timeout': 0,
+        'in_flight': 0,
+        'accepted': 1,
+        'rejected': 1,
+    }
+
+
+def test_limiter_timeout():
+    limiter = ActionLimiter(1, timeout=5)
+    limiter.acquire()
+
+    # the slot is freed while the request waits
+    Timer(0.01, limiter.release).start()
+
+    assert limiter.acquire()
+    assert not limiter.acquire(blocking=False)
+
+
+def test_limit_concurrency(request_factory):
+    from actionviews.base import View
+    from actionviews.decorators import limit_concurrency
+
+    instances = []
+
+    class TestView(View):
+
+        def __init__(self):
+            instances.append(self)
+
+        def get(self, request, *args, **kwargs):
+            return HttpResponse()
+
+        @limit_concurrency(1, status_code=429, retry_after=10)
+        def do_report(self):
+            return {}
+
+    view = TestView.urls[0].callback
+    limiter = TestView.action_plans['report'].limiter
+    limiter.acquire()
+
+    response = view(request_factory.get('/'))
+
+    assert response.status_code == 429
+    assert response['Retry-After'] == '10'
+    assert instances == []
+
+    limiter.release()
+    response = view(request_factory.get('/'))
+
+    assert response.status_code == 200
+    assert len(instances) == 1
+
+    label = '{}.{}.report'.format(__name__, TestView.__qualname__)
+
+    assert limits.snapshot()[label] == {
+        'max_concurrency': 1,
+        'timeout': 0,
+        'in_flight': 0,
+        'accepted': 2,
+        'rejected': 1,
+    }
+
+
+def test_limit_concurrency_batch(request_factory):
+    from actionviews.base import JSONView
+    from actionviews.decorators import limit_concurrency
+
+    calls = []
+
+    class TestView(JSONView):
+
+        @limit_concurrency(1)
+        def do_report(self):
+            calls.append('report')
+            return {'report': 1}
+
+    batch = TestView.urls[0].callback.batch
+    limiter = TestView.action_plans['report'].limiter
+    limiter.acquire()
+
+    assert batch(request_factory.get('/report/')) == (503, None)
+    assert calls == []
+    assert limiter.stats()['rejected'] == 1
+
+    limiter.release()
+
+    assert batch(request_factory.get('/report/')) == (200, {'report': 1})
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_limit_concurrency_held_while_rendering(monkeypatch, request_factory):
+    from django.conf.urls import patterns
+    from django.http.response import StreamingHttpResponse
+    from actionviews.base import TemplateView, View
+    from actionviews.decorators import limit_concurrency
+
+    in_flight = []
+
+    class Report(object):
+
+        def __str__(self):
+            in_flight.append(limiter.stats()['in_flight'])
+            return 'report'
+
+    # reuses the template of TestTemplateView
+    class TestTemplateView(TemplateView):
+
+        @limit_concurrency(1)
+        def do_index(self):
+            return {'result': Report()}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {
+                'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    limiter = TestTemplateView.action_plans['index'].limiter
+    response = TestTemplateView.urls[0].callback(
+        request_factory.get('/index/'))
+
+    assert limiter.stats()['in_flight'] == 1
+
+    response.render()
+
+    assert response.content == b'report'
+    assert in_flight == [1]
+    assert limiter.stats()['in_flight'] == 0
+
+    # closing doesn't release the slot twice
+    response.close()
+
+    assert limiter.stats()['in_flight'] == 0
+
+    class TestStreamingView(View):
+
+        def get(self, request, *args, **kwargs):
+            return StreamingHttpResponse(iter(['a', 'b']))
+
+        @limit_concurrency(1)
+        def do_index(self):
+            return {}
+
+    limiter = TestStreamingView.action_plans['index'].limiter
+    response = TestStreamingView.urls[0].callback(request_factory.get('/'))
+
+    assert list(response) == [b'a', b'b']
+    assert limiter.stats()['in_flight'] == 1
+
+    response.close()
+
+    assert limiter.stats()['in_flight'] == 0
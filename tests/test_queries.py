@@ -0,0 +1,73 @@
+from django.db import connections
+import pytest
+
+from actionviews.queries import QueryAccounting, normalize_sql
+
+
+def query(value):
+    with connections['sqlite'].cursor() as cursor:
+        cursor.execute('SELECT %s', [value])
+        return cursor.fetchone()[0]
+
+
+class LazyResult(object):
+
+    def __str__(self):
+        return str(sum(query(index) for index in range(5)))
+
+
+@pytest.fixture
+def accounting():
+    accounting = QueryAccounting(using=['sqlite'])
+    accounting.enable()
+    yield accounting
+    accounting.disable()
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        "SELECT * FROM t WHERE id IN (1, 2,3) AND name = 'it''s'\n") == (
+            'SELECT * FROM t WHERE id IN (...) AND name = ?')
+
+
+def test_query_accounting(accounting, request_factory, monkeypatch):
+    from django.conf.urls import patterns
+    from actionviews.base import TemplateView
+    from actionviews.decorators import child_view
+
+    class TestTemplateView(TemplateView):
+
+        def do_index(self:''):
+            query(1)
+            return {'result': LazyResult()}
+
+    class ParentView(TemplateView):
+
+        @child_view(TestTemplateView)
+        def do_parent(self:''):
+            query(1)
+            query(2)
+            return {}
+
+    monkeypatch.setattr(
+        'django.core.urlresolvers.get_urlconf',
+        lambda: type(
+            'urlconf', (), {'urlpatterns': patterns('', *ParentView.urls)}))
+
+    # queries out of the phases aren't accounted
+    query(0)
+
+    request = request_factory.get('/')
+    response = ParentView.urls[0].url_patterns[0].callback(
+        request, **ParentView.urls[0].default_kwargs)
+
+    assert response.rendered_content == '10'
+
+    snapshot = accounting.snapshot()
+
+    assert snapshot['ParentView.parent']['parent']['count'] == 2
+    assert snapshot['ParentView.parent']['parent']['n_plus_one'] == []
+    assert snapshot['TestTemplateView.index']['action']['count'] == 1
+    assert snapshot['TestTemplateView.index']['render']['count'] == 5
+    assert snapshot['TestTemplateView.index']['render']['n_plus_one'] == [
+        {'sql': 'SELECT ?', 'repeats': 5}]
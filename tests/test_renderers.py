@@ -0,0 +1,61 @@
+from decimal import Decimal
+import datetime
+import uuid
+
+from django.core.exceptions import ImproperlyConfigured
+import pytest
+
+from actionviews.renderers import JSONRenderer, MessagePackRenderer,\
+    Renderer, build_negotiation_table, negotiate, orjson, orjson_dumps,\
+    parse_accept, stdlib_json_dumps
+
+
+class HTMLRenderer(Renderer):
+    media_type = 'text/html'
+    format = 'html'
+
+
+@pytest.fixture
+def table():
+    return build_negotiation_table(
+        [HTMLRenderer(), JSONRenderer(), MessagePackRenderer()])
+
+
+def test_parse_accept():
+    assert parse_accept(
+        'text/*;q=0.8, application/json, */*;q=0.1, image/png;q=0') == (
+            'application/json', 'text/*', '*/*')
+    assert parse_accept('*/*, text/html') == ('text/html', '*/*')
+
+
+def test_negotiate(table):
+    assert negotiate(table).format == 'html'
+    assert negotiate(table, '*/*').format == 'html'
+    assert negotiate(table, 'application/json').format == 'json'
+    assert negotiate(table, 'image/png, application/*').format == 'json'
+    assert negotiate(table, 'image/png') is None
+    assert negotiate(table, 'text/html', 'json').format == 'json'
+    assert negotiate(table, None, 'xml') is None
+
+
+def test_build_negotiation_table_skips_unavailable():
+    renderer = JSONRenderer()
+    renderer.available = False
+
+    with pytest.raises(ImproperlyConfigured):
+        build_negotiation_table([renderer])
+
+
+@pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+def test_json_encoders_parity():
+    data = {
+        'a': {1: 'x'},
+        'when': datetime.datetime(2016, 1, 2, 3, 4, 5, 123456),
+        'day': datetime.date(2016, 1, 2),
+        'at': datetime.time(3, 4, 5, 123456),
+        'price': Decimal('1.10'),
+        'key': uuid.UUID(int=1),
+        'items': [1, 'two', None, True],
+    }
+
+    assert orjson_dumps(data).decode() == stdlib_json_dumps(data)
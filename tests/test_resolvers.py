@@ -0,0 +1,129 @@
+from django.conf.urls import patterns
+from django.core.urlresolvers import resolve, reverse, Resolver404
+import pytest
+
+
+@pytest.fixture
+def urlconf(monkeypatch):
+
+    def set_urlconf(view_class):
+        monkeypatch.setattr(
+            'django.core.urlresolvers.get_urlconf',
+            lambda: type(
+                'urlconf', (), {
+                    'urlpatterns': patterns('', *view_class.urls)}))
+
+    return set_urlconf
+
+
+@pytest.fixture
+def TestView():
+    from actionviews.base import View
+
+    class TestView(View):
+        single_pass_urls = True
+
+        def do_index(self:'', skip:r'\d+'=0):
+            pass
+
+        def do_detail(self, pk:r'\d+'):
+            pass
+
+        def do_article(self:'article', pk:r'\d+'):
+            pass
+
+        def do_number(self:r'\d+'):
+            pass
+
+    return TestView
+
+
+def test_single_pass_urls(TestView):
+    from actionviews.resolvers import ActionURLResolver
+
+    urls = TestView.urls
+
+    assert len(urls) == 1
+    assert isinstance(urls[0], ActionURLResolver)
+    assert ({url.name for url in urls[0].url_patterns} ==
+        {'index', 'detail', 'article', 'number'})
+
+
+def test_single_pass_candidates(TestView):
+    buckets, fallback = TestView.urls[0].candidates
+
+    assert set(buckets) == {'detail', 'article'}
+    assert {url.name for url in fallback} == {'index', 'number'}
+    assert ({url.name for url in buckets['detail']} ==
+        {'index', 'number', 'detail'})
+
+
+@pytest.mark.parametrize('path,func_name,kwargs', [
+    ('/', 'do_index', {'skip': 0}),
+    ('/detail/pk/1/', 'do_detail', {'pk': '1'}),
+    ('/article/pk/2/', 'do_article', {'pk': '2'}),
+    ('/42/', 'do_number', {}),
+])
+def test_single_pass_resolve(urlconf, TestView, path, func_name, kwargs):
+    urlconf(TestView)
+
+    resolver_match = resolve(path)
+
+    assert resolver_match.func.__name__ == func_name
+    assert resolver_match.kwargs == kwargs
+
+
+def test_single_pass_not_found(urlconf, TestView):
+    urlconf(TestView)
+
+    with pytest.raises(Resolver404):
+        resolve('/detail/pk/abc/')
+
+
+def test_single_pass_reverse(urlconf, TestView):
+    urlconf(TestView)
+
+    assert reverse('detail', kwargs={'pk': 1}) == '/detail/pk/1/'
+
+
+def test_single_pass_child(urlconf):
+    from actionviews.base import View
+    from actionviews.decorators import child_view
+    from actionviews.resolvers import ActionURLResolver
+
+    class ChildView(View):
+        single_pass_urls = True
+
+        def do_clist(self):
+            pass
+
+        def do_cdetail(self, child_id):
+            pass
+
+    class ParentView(View):
+        single_pass_urls = True
+
+        def do_plist(self):
+            pass
+
+        @child_view(ChildView)
+        def do_pdetail(self, parent_id):
+            pass
+
+    urlconf(ParentView)
+
+    parent_urls = {
+        url.regex.pattern: url for url in ParentView.urls[0].url_patterns}
+    child_resolver = parent_urls[r'^pdetail/parent_id/(?P<parent_id>[\w\d]+)/']
+
+    assert isinstance(child_resolver, ActionURLResolver)
+    assert child_resolver.url_patterns is ChildView.urls[0].url_patterns
+
+    resolver_match = resolve('/pdetail/parent_id/1/cdetail/child_id/2/')
+
+    assert resolver_match.func.__name__ == 'do_cdetail'
+    assert resolver_match.kwargs['parent_id'] == '1'
+    assert resolver_match.kwargs['child_id'] == '2'
+    assert resolver_match.kwargs[
+        'parent:{}.test_single_pass_child.<locals>.ParentView.pdetail'.format(
+            __name__)].name == 'pdetail'
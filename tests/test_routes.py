@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.conf.urls import include, url
+from django.core.management import call_command
+from django.core.management.base import CommandError
+import pytest
+
+from actionviews.routes import analyze_routes, find_backtracking, iter_routes,\
+    sre_parse
+
+
+@pytest.fixture
+def urlconf():
+    from actionviews.base import View
+    from actionviews.decorators import child_view
+
+    class ChildView(View):
+
+        def do_index(self:''):
+            return {}
+
+    class ParentView(View):
+
+        @child_view(ChildView)
+        def do_index(self:'', pk:r'\d+'):
+            return {}
+
+        def do_detail(self, slug:r'(\w+)+'):
+            return {}
+
+        def do_any(self, slug):
+            return {}
+
+    class ShadowedView(View):
+
+        def do_detail(self, slug:r'[a-z]+'):
+            return {}
+
+    return type('urlconf', (), {'urlpatterns': [
+        url(r'^', include(ParentView.urls)),
+        url(r'^', include(ShadowedView.urls)),
+    ]})
+
+
+@pytest.mark.parametrize('regex, problem', [
+    (r'[\w\d]+', None),
+    (r'(\d{4})+', None),
+    (r'(\w+)+', 'nested quantifiers'),
+    (r'(a*)*b', 'nested quantifiers'),
+    (r'(a|aa)+', 'quantified overlapping alternatives'),
+    (r'(\w|\w\d)+', 'quantified overlapping alternatives'),
+    (r'(a|bc)+', None),
+    (r'(a|b)+', None),
+])
+def test_find_backtracking(regex, problem):
+    assert find_backtracking(sre_parse.parse(regex)) == problem
+
+
+def test_iter_routes(urlconf):
+    routes = [(route.regex, route.label) for route in iter_routes(urlconf)]
+
+    assert routes == [
+        (r'^any/slug/(?P<slug>[\w\d]+)/$', 'ParentView.any'),
+        (r'^detail/slug/(?P<slug>(\w+)+)/$', 'ParentView.detail'),
+        (r'^pk/(?P<pk>\d+)/$', 'ChildView.index'),
+        (r'^detail/slug/(?P<slug>[a-z]+)/$', 'ShadowedView.detail'),
+    ]
+
+
+def test_analyze_routes(urlconf):
+    report = analyze_routes(urlconf, budget=0.01)
+    findings = {(finding.kind, finding.label) for finding in report.findings}
+
+    assert findings == {
+        ('shadowed', 'ShadowedView.detail'),
+        ('backtracking', 'ParentView.detail'),
+        ('slow', 'ParentView.detail'),
+    }
+
+
+def test_analyze_routes_command(urlconf):
+    stdout = StringIO()
+    stderr = StringIO()
+
+    call_command(
+        'analyze_routes', urlconf=urlconf, timing=False, stdout=stdout,
+        stderr=stderr)
+
+    assert 'ParentView.any' in stdout.getvalue()
+    assert 'shadowed: ShadowedView.detail' in stderr.getvalue()
+
+    with pytest.raises(CommandError):
+        call_command(
+            'analyze_routes', urlconf=urlconf, timing=False, strict=True,
+            stdout=stdout, stderr=stderr)
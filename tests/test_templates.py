@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.conf.urls import include, url
+from django.core.management import call_command
+from django.core.management.base import CommandError
+import pytest
+
+from actionviews.templates import warm_templates
+
+
+@pytest.fixture
+def urlconf():
+    from actionviews.base import JSONView, StreamingTemplateView,\
+        TemplateView
+
+    class TestTemplateView(TemplateView):
+
+        def do_index(self:''):
+            return {}
+
+        def do_missing(self):
+            return {}
+
+    class TestStreamingView(StreamingTemplateView):
+
+        def do_index(self:''):
+            return iter([])
+
+        def do_plain(self):
+            return iter([])
+
+    class TestJSONView(JSONView):
+
+        def do_index(self:''):
+            return {}
+
+    return type('urlconf', (), {'urlpatterns': [
+        url(r'^', include(TestTemplateView.urls)),
+        url(r'^ns/', include(TestTemplateView.urls, namespace='ns')),
+        url(r'^stream/', include(TestStreamingView.urls)),
+        url(r'^json/', include(TestJSONView.urls)),
+    ]})
+
+
+def test_warm_templates(urlconf):
+    report = warm_templates(urlconf)
+
+    assert sorted(report.loaded) == [
+        'TestStreamingView/index.html',
+        'TestStreamingView/index_head.html',
+        'TestStreamingView/index_tail.html',
+        'TestStreamingView/plain.html',
+        'TestTemplateView/index.html',
+    ]
+    assert sorted(report.missing) == [
+        ('TestTemplateView.index', ('ns/TestTemplateView/index.html',)),
+        ('TestTemplateView.missing', ('TestTemplateView/missing.html',)),
+        ('TestTemplateView.missing', ('ns/TestTemplateView/missing.html',)),
+    ]
+
+
+def test_warm_templates_command(urlconf):
+    stdout = StringIO()
+    stderr = StringIO()
+
+    call_command('warm_templates', urlconf=urlconf, stdout=stdout, stderr=stderr)
+
+    assert stdout.getvalue() == 'Loaded 5 templates\n'
+    assert 'TestTemplateView.missing' in stderr.getvalue()
+
+    with pytest.raises(CommandError):
+        call_command(
+            'warm_templates', urlconf=urlconf, strict=True, stdout=stdout,
+            stderr=stderr)
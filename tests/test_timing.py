@@ -0,0 +1,124 @@
+from django.conf.urls import patterns
+from django.core.urlresolvers import resolve
+import pytest
+
+
+@pytest.fixture
+def aggregator():
+    from actionviews import timing
+
+    aggregator = timing.TimingAggregator()
+    timing.add_collector(aggregator)
+
+    yield aggregator
+
+    timing.remove_collector(aggregator)
+
+
+@pytest.fixture
+def urlconf(monkeypatch):
+
+    def set_urlconf(view_class):
+        monkeypatch.setattr(
+            'django.core.urlresolvers.get_urlconf',
+            lambda: type(
+                'urlconf', (), {
+                    'urlpatterns': patterns('', *view_class.urls)}))
+
+    return set_urlconf
+
+
+def test_no_collectors(request_factory, monkeypatch):
+    from actionviews import timing
+    from actionviews.base import TemplateView
+
+    class TestTemplateView(TemplateView):
+
+        def do_index(self:''):
+            return {'result': 'test'}
+
+    def fail(*args, **kwargs):
+        raise AssertionError('timing event emitted')
+
+    monkeypatch.setattr(timing, 'emit', fail)
+
+    view = TestTemplateView.urls[0].callback
+    request = request_factory.get('/')
+    request.resolver_match = resolve('/', urlconf=type(
+        'urlconf', (), {'urlpatterns': patterns('', *TestTemplateView.urls)}))
+
+    assert view(request).render().content == b'test'
+
+
+def test_phases(aggregator, urlconf, request_factory):
+    from actionviews.base import View, TemplateView
+    from actionviews.decorators import child_view
+
+    class ChildView(TemplateView):
+        single_pass_urls = True
+
+        def do_index(self):
+            return {}
+
+    class ParentView(View):
+        single_pass_urls = True
+
+        @child_view(ChildView)
+        def do_pindex(self, result='test'):
+            return {'result': result}
+
+    urlconf(ParentView)
+
+    path = '/pindex/result/test/index/'
+    resolver_match = resolve(path)
+    request = request_factory.get(path)
+    request.resolver_match = resolver_match
+    response = resolver_match.func(request, **resolver_match.kwargs)
+    response.render()
+
+    stats = aggregator.snapshot()
+
+    assert set(stats['ParentView.pindex']) == {'parent'}
+    assert set(stats['ChildView.index']) == {
+        'match', 'action', 'render'}
+    assert stats['ChildView.index']['action']['count'] == 1
+    assert sum(
+        count for bound, count in
+        stats['ChildView.index']['render']['buckets']) == 1
+
+
+def test_short_circuit(aggregator, request_factory):
+    from django.http.response import HttpResponse
+    from actionviews.base import TemplateView
+
+    class TestView(TemplateView):
+
+        def do_index(self:''):
+            return HttpResponse(status=201)
+
+    view = TestView.urls[0].callback
+    response = view(request_factory.get('/'))
+
+    assert response.status_code == 201
+    assert set(aggregator.snapshot()['TestView.index']) == {
+        'action', 'short_circuit'}
+
+
+def test_aggregator_buckets():
+    from actionviews.base import View
+    from actionviews.timing import TimingAggregator, TimingEvent
+
+    aggregator = TimingAggregator(buckets=[0.1, 1, float('inf')])
+
+    for duration in [0.01, 0.5, 0.7, 10]:
+        aggregator(TimingEvent(View, 'index', 'action', duration))
+
+    stats = aggregator.snapshot()['View.index']['action']
+
+    assert stats['count'] == 4
+    assert stats['sum'] == pytest.approx(11.21)
+    assert stats['buckets'] == [(0.1, 1), (1, 2), (float('inf'), 1)]
+
+    aggregator.reset()
+
+    assert aggregator.snapshot() == {}